@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+from async_parser import AsyncParser
+from columns import Columns
+from decoder import Decoder
+
+
+class AsyncDecoder(Decoder):
+    """
+    Decoder of async iterables of data chunks or asyncio.StreamReader, see AsyncParser.
+    """
+
+    parser_class = AsyncParser
+
+    def __init__(self, source, yield_every=65536, **kwargs):
+        """
+        :param source: async iterable of data chunks or asyncio.StreamReader
+        :param yield_every: count of chars to parse before yielding to the event loop
+        :param kwargs: other Decoder arguments
+        """
+        super().__init__(AsyncParser.iter_chunks(source), **kwargs)
+        self.parser.yield_every = yield_every
+
+    @classmethod
+    def from_file(cls, path, chunk_size=65536, yield_every=65536, **kwargs):
+        """
+        Make a decoder of file mapped into memory, passing memoryview slices of it to the parser, see
+        Decoder.from_file().
+        """
+        return cls(AsyncParser.iter_file_chunks_async(path, chunk_size), yield_every, **kwargs)
+
+    async def decode(self):
+        async for data in self.data_gen:
+            await self._feed_async(data)
+        self._close()
+
+        return self.value
+
+    async def iter_items(self, prefix):
+        """
+        Decode data, yielding values found at prefix path as soon as they are built, see Decoder.iter_items().
+        """
+        self.prefix = prefix.split('.') if prefix else []
+        items = self.items
+
+        async for data in self.data_gen:
+            for piece in self.parser.split_chunk(data):
+                self._feed(piece)
+                for item in items:
+                    yield item
+                items.clear()
+                await self.parser.pause(len(piece))
+        self._close()
+        for item in items:
+            yield item
+        items.clear()
+
+    def iter_documents(self):
+        """
+        Decode a stream of top-level values, yielding every value as soon as it is built, see
+        Decoder.iter_documents().
+        """
+        self.parser.multi_document = True
+
+        return self.iter_items('')
+
+    async def decode_columns(self, prefix=''):
+        """
+        Decode an array of objects into a dict of columns by key, see Decoder.decode_columns().
+        """
+        columns = Columns()
+        async for record in self.iter_items(prefix + '.item' if prefix else 'item'):
+            columns.add(record)
+
+        return columns.columns
+
+    async def select(self, selectors, validate=True):
+        """
+        Decode data, building only values at paths matching selectors, see Decoder.select().
+        """
+        selection = self._start_selection(selectors, validate)
+
+        async for data in self.data_gen:
+            await self._feed_async(data)
+        self._close()
+
+        return selection.values
+
+    async def _feed_async(self, data):
+        for piece in self.parser.split_chunk(data):
+            self._feed(piece)
+            await self.parser.pause(len(piece))
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+from parser import Parser, _EventBuffer
+
+
+class AsyncParser(Parser):
+    """
+    Parser consuming async iterators of data chunks or asyncio.StreamReader.
+
+    Large chunks are parsed in pieces, giving control back to the event loop every yield_every chars, so that
+    a large document does not stall other coroutines.
+    """
+
+    def __init__(self, handler=None, yield_every=65536, **kwargs):
+        """
+        :param handler: Handler receiving events pushed with feed(), feed_async() and close()
+        :param yield_every: count of chars to parse before yielding to the event loop
+        :param kwargs: other Parser arguments
+        """
+        super().__init__(handler, **kwargs)
+        self.yield_every = yield_every
+        # Count of chars parsed since the event loop has been yielded to
+        self.unyielded = 0
+
+    async def parse(self, source):
+        """
+        Parse data chunks from source, yielding events as (event name, event param) tuples.
+
+        Replaces parser's handler.
+
+        :param source: async iterable of data chunks or asyncio.StreamReader
+        """
+
+        buffer = _EventBuffer()
+        self.handler = buffer
+
+        async for data in self.iter_chunks(source):
+            for piece in self.split_chunk(data):
+                for event in self._flush_events(buffer.events, self.feed, piece):
+                    yield event
+                await self.pause(len(piece))
+
+        for event in self._flush_events(buffer.events, self.close):
+            yield event
+
+    async def parse_file(self, path, chunk_size=65536):
+        """
+        Parse file mapped into memory, yielding events as parse() does.
+
+        :param path: file path
+        :param chunk_size: size of memoryview chunks passed to the parser
+        """
+
+        async for event in self.parse(self.iter_file_chunks_async(path, chunk_size)):
+            yield event
+
+        # Last chunk would keep the file mapped as long as the parser lives
+        self.data = self.empty_token
+
+    async def feed_async(self, data):
+        """
+        Parse data chunk, pushing events to the handler and yielding to the event loop between pieces of it.
+
+        :param data: str or UTF-8 encoded bytes-like object
+        """
+
+        for piece in self.split_chunk(data):
+            self.feed(piece)
+            await self.pause(len(piece))
+
+    def split_chunk(self, data):
+        """
+        Split data chunk into pieces of at most yield_every items, slicing bytes-like objects without copying.
+        """
+
+        step = self.yield_every
+        if len(data) <= step:
+            return [data]
+
+        if not isinstance(data, str):
+            data = memoryview(data)
+        return [data[start:start + step] for start in range(0, len(data), step)]
+
+    async def pause(self, count):
+        """
+        Account count of parsed chars, yielding to the event loop once yield_every of them have been parsed.
+        """
+
+        self.unyielded += count
+        if self.unyielded >= self.yield_every:
+            self.unyielded = 0
+            await asyncio.sleep(0)
+
+    @staticmethod
+    async def iter_file_chunks_async(path, chunk_size=65536):
+        """
+        Map file into memory, yielding memoryview slices of it as an async iterator, see Parser.iter_file_chunks().
+        """
+
+        for data in Parser.iter_file_chunks(path, chunk_size):
+            yield data
+
+    @staticmethod
+    async def iter_chunks(source, chunk_size=65536):
+        """
+        Yield data chunks of an async iterable, or read from asyncio.StreamReader until EOF.
+
+        :param source: async iterable of data chunks or asyncio.StreamReader
+        :param chunk_size: maximum size of chunks read from asyncio.StreamReader
+        """
+
+        if isinstance(source, asyncio.StreamReader):
+            while True:
+                data = await source.read(chunk_size)
+                if not data:
+                    return
+                yield data
+        else:
+            async for data in source:
+                yield data
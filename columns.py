@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+from array import array
+
+
+# Integers within this range are converted to floats exactly
+MAX_EXACT_FLOAT_INT = 2 ** 53
+
+
+class Columns:
+    """
+    Columns of an array of objects, built record by record.
+
+    Integer columns are kept in array('q') and float columns in array('d'). Columns with values of other types,
+    with values of mixed types which cannot be converted exactly, or with keys missing in some records fall back
+    to lists, where missing values are None.
+    """
+
+    def __init__(self):
+        # Columns by key, all of them of the length of the count of records added
+        self.columns = {}
+        self.count = 0
+
+    def add(self, record):
+        """
+        Append values of an object to columns.
+
+        :param record: dict
+        """
+        if record.__class__ is not dict:
+            raise ValueError("Expected an object, got {}".format(record.__class__.__name__))
+
+        columns = self.columns
+        for key, value in record.items():
+            column = columns.get(key)
+            if column is None:
+                columns[key] = self._new_column(value)
+            elif column.__class__ is list:
+                column.append(value)
+            elif column.typecode == 'q' and value.__class__ is int and -2 ** 63 <= value < 2 ** 63:
+                column.append(value)
+            elif column.typecode == 'd' and value.__class__ is float:
+                column.append(value)
+            else:
+                columns[key] = self._convert_column(column, value)
+        self.count += 1
+
+        # Columns are a superset of record's keys, so some are missing in the record only if there are more
+        if len(columns) != len(record):
+            for key, column in columns.items():
+                if len(column) < self.count:
+                    if column.__class__ is not list:
+                        column = columns[key] = column.tolist()
+                    column.append(None)
+
+    def _new_column(self, value):
+        """
+        Make a column for a key first found in current record, filling it with None for previous records.
+        """
+        if self.count == 0:
+            if value.__class__ is int and -2 ** 63 <= value < 2 ** 63:
+                return array('q', [value])
+            if value.__class__ is float:
+                return array('d', [value])
+
+        return [None] * self.count + [value]
+
+    @staticmethod
+    def _convert_column(column, value):
+        """
+        Convert array column to one able to hold value, and append value to it.
+        """
+        if column.typecode == 'q' and value.__class__ is float:
+            if all(-MAX_EXACT_FLOAT_INT <= item <= MAX_EXACT_FLOAT_INT for item in column):
+                column = array('d', column)
+                column.append(value)
+                return column
+        elif column.typecode == 'd' and value.__class__ is int:
+            if -MAX_EXACT_FLOAT_INT <= value <= MAX_EXACT_FLOAT_INT:
+                column.append(value)
+                return column
+
+        column = column.tolist()
+        column.append(value)
+        return column
@@ -1,52 +1,266 @@
 # -*- coding: utf-8 -*-
 
 from parser import Parser
+from handler import Handler
 from exceptions import ParseError
-import time
+from selector import Selection
+from columns import Columns
+from numeric_arrays import array_from_list, is_typed_array
+from stats import InstrumentedHandler
+from time import perf_counter
 
-class Decoder:
-    def __init__(self, data_gen):
-        parser = Parser()
-        self.parser_gen = parser.parse(data_gen)
+
+class Decoder(Handler):
+    """
+    Builds Python values from parser events, keeping containers being built on an explicit stack instead of
+    recursing on every nesting level.
+    """
+
+    parser_class = Parser
+
+    def __init__(self, data_gen, max_depth=None, stats=None, bytes_mode=False, parse_int=None, parse_float=None,
+                 parse_constant=None, numeric_arrays=None):
+        """
+        :param data_gen: iterable of data chunks
+        :param max_depth: maximum nesting depth of objects and arrays, unlimited if None
+        :param stats: Stats collecting counters and timings, nothing is measured if None
+        :param bytes_mode: run parser on UTF-8 encoded chunks as they are, see Parser
+        :param parse_int: hook converting integer literals, see Parser
+        :param parse_float: hook converting float literals, e.g. decimal.Decimal, see Parser
+        :param parse_constant: hook converting "-Infinity", "Infinity" and "NaN", see Parser
+        :param numeric_arrays: decode non-empty arrays of numbers only into typed arrays, "array" for array('d')
+            or array('q') and "numpy" for numpy.ndarray
+        """
+        self.data_gen = data_gen
+        self.max_depth = max_depth
+        self.stats = stats
+        self.parser = self.parser_class(
+            self if stats is None else InstrumentedHandler(self, stats),
+            bytes_mode=bytes_mode,
+            parse_int=parse_int,
+            parse_float=parse_float,
+            parse_constant=parse_constant,
+            numeric_arrays=numeric_arrays
+        )
+
+        # Container being built and key of a value to put in it, if it is an object
+        self.container = None
+        self.key = None
+        # Enclosing containers and keys under which current ones go into them
+        self.containers = []
+        self.keys = []
+
+        self.value = None
+
+        # Path parts of values yielded by iter_items(), and length of current container's path if the path is
+        # a beginning of the prefix
+        self.prefix = None
+        self.prefix_depth = -1
+        self.items = []
+
+    @classmethod
+    def from_file(cls, path, chunk_size=65536, **kwargs):
+        """
+        Make a decoder of file mapped into memory, passing memoryview slices of it to the parser.
+
+        :param path: file path
+        :param chunk_size: size of memoryview chunks
+        :param kwargs: other Decoder arguments
+        """
+        return cls(Parser.iter_file_chunks(path, chunk_size), **kwargs)
 
     def decode(self):
-        evt, res = self._parse_sub_tree()
-
-        try:
-            evt, res = next(self.parser_gen)
-            raise ParseError("Extra data after close")
-        except StopIteration:
-            pass
-
-        return res
-
-    def _parse_sub_tree(self):
-        obj = None
-
-        while True:
-            start = time.time()
-            print("parser_in_decoder: loop start")
-            evt_name, evt_param = next(self.parser_gen)
-            print("parser_in_decoder: loop end")
-            elapsed_time = time.time() - start
-            print("parser_in_decoder={}".format(elapsed_time))
-            if evt_name == "object_start":
-                obj = {}
-            elif evt_name == "object_key_end":
-                key = evt_param
-                _, value = self._parse_sub_tree()
-                obj[key] = value
-            elif evt_name == "object_end":
-                return True, obj
-            elif evt_name == "array_start":
-                obj = []
-                while True:
-                    is_data, value = self._parse_sub_tree()
-                    if is_data:
-                        obj.append(value)
-                    else:
-                        return True, obj
-            elif evt_name == "array_end":
-                return False, None
-            elif evt_name == "value_end":
-                return True, evt_param
+        for data in self.data_gen:
+            self._feed(data)
+        self._close()
+
+        return self.value
+
+    def iter_items(self, prefix):
+        """
+        Decode data, yielding values found at prefix path as soon as they are built.
+
+        Yielded values are not put into their parent containers, so only those of a single data chunk are kept
+        in memory at a time.
+
+        :param prefix: dot separated path of object keys and "item" for array elements, e.g. "results.item";
+            an empty prefix yields the root value
+        """
+        self.prefix = prefix.split('.') if prefix else []
+        items = self.items
+
+        for data in self.data_gen:
+            self._feed(data)
+            yield from items
+            items.clear()
+        self._close()
+        yield from items
+        items.clear()
+
+    def iter_documents(self):
+        """
+        Decode a stream of top-level values separated by whitespace or RS chars, such as NDJSON, yielding every
+        value as soon as it is built.
+        """
+        self.parser.multi_document = True
+
+        yield from self.iter_items('')
+
+    def decode_columns(self, prefix=''):
+        """
+        Decode an array of objects into a dict of columns by key, see Columns.
+
+        Records are built one at a time and only their values are kept, in array('q') and array('d') columns
+        for numbers and in lists otherwise.
+
+        :param prefix: dot separated path of the array, as in iter_items(); an empty prefix is the root value
+        :return: dict of columns by key, every column holding a value for each record
+        """
+        columns = Columns()
+        for record in self.iter_items(prefix + '.item' if prefix else 'item'):
+            columns.add(record)
+
+        return columns.columns
+
+    def select(self, selectors, validate=True):
+        """
+        Decode data, building only values at paths matching selectors.
+
+        Other values are validated by the parser without building dicts, lists, strings or numbers out of them.
+
+        :param selectors: iterable of JSONPath-like selectors, e.g. "$.meta.id" or "$.items[*].price"
+        :param validate: validate other values, or skip them only looking for brackets and string boundaries
+        :return: dict of lists of matching values by selector, in the order values appear in data
+        """
+        selection = self._start_selection(selectors, validate)
+
+        for data in self.data_gen:
+            self._feed(data)
+        self._close()
+
+        return selection.values
+
+    def _start_selection(self, selectors, validate):
+        """
+        Make a Selection and pass parser events to it instead of the decoder.
+        """
+        selection = Selection(selectors, self.parser, self, validate)
+        self.parser.handler = selection if self.stats is None else InstrumentedHandler(selection, self.stats)
+
+        return selection
+
+    def _feed(self, data):
+        if self.stats is None:
+            self.parser.feed(data)
+        else:
+            start = perf_counter()
+            self.parser.feed(data)
+            chars = None if self.parser.bytes_mode else len(self.parser.data)
+            self.stats.on_chunk(data, chars, perf_counter() - start)
+
+    def _close(self):
+        if self.stats is None:
+            self.parser.close()
+        else:
+            start = perf_counter()
+            self.parser.close()
+            self.stats.feed_time += perf_counter() - start
+
+    def on_object_start(self):
+        self._push_container({})
+
+    def on_object_end(self):
+        self._pop_container()
+
+    def on_array_start(self):
+        self._push_container([])
+
+    def on_array_end(self):
+        # Arrays split between data chunks are built as lists, and are converted once complete
+        if self.parser.numeric_arrays is not None:
+            values = array_from_list(self.container, self.parser.numeric_arrays)
+            if values is not None:
+                self.container = values
+        self._pop_container()
+
+    def on_key(self, key):
+        self.key = key
+
+    def on_value(self, value):
+        container = self.container
+        if self.prefix is not None and is_typed_array(value) and self._is_inside_prefix():
+            # Parser pushes arrays of numbers as single values only if a chunk holds them completely
+            self._expand_typed_array(value)
+        elif self.prefix is not None and self._is_item():
+            self.items.append(value)
+        elif container is None:
+            self.value = value
+        elif container.__class__ is list:
+            container.append(value)
+        else:
+            container[self.key] = value
+
+    def _push_container(self, container):
+        if self.max_depth is not None and len(self.containers) >= self.max_depth:
+            raise ParseError("Maximum depth of {} exceeded (global index {})".format(
+                self.max_depth,
+                self.parser.index
+            ))
+
+        if self.prefix is not None:
+            depth = len(self.containers)
+            if depth == 0 or self.prefix_depth == depth - 1 and self._is_on_prefix(depth - 1):
+                self.prefix_depth = depth
+
+        self.containers.append(self.container)
+        self.keys.append(self.key)
+        self.container = container
+
+    def _pop_container(self):
+        container = self.container
+        self.container = self.containers.pop()
+        self.key = self.keys.pop()
+
+        if self.prefix_depth == len(self.containers):
+            self.prefix_depth -= 1
+
+        self.on_value(container)
+
+    def _is_item(self):
+        """
+        Check if a value being put in current container is at prefix path.
+        """
+        if self.container is None:
+            return len(self.prefix) == 0
+
+        depth = len(self.containers) - 1
+        return self.prefix_depth == depth and len(self.prefix) == depth + 1 and self._is_on_prefix(depth)
+
+    def _is_inside_prefix(self):
+        """
+        Check if prefix path goes inside a value being put in current container.
+        """
+        if self.container is None:
+            return len(self.prefix) > 0
+
+        depth = len(self.containers) - 1
+        return self.prefix_depth == depth and len(self.prefix) > depth + 1 and self._is_on_prefix(depth)
+
+    def _expand_typed_array(self, value):
+        """
+        Build a typed array pushed as a single value from events of its elements, as if it was split between
+        data chunks.
+        """
+        self.on_array_start()
+        for item in value.tolist():
+            self.on_value(item)
+        self.on_array_end()
+
+    def _is_on_prefix(self, depth):
+        """
+        Check if a value being put in current container matches prefix path part, given current container's depth.
+        """
+        if depth >= len(self.prefix):
+            return False
+
+        return self.prefix[depth] == ('item' if self.container.__class__ is list else self.key)
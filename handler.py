@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+
+
+class Handler:
+    """
+    Receives parser events pushed with Parser.feed() and Parser.close().
+
+    Every method does nothing by default, so a subclass only has to override those it is interested in.
+    """
+
+    def on_object_start(self):
+        pass
+
+    def on_object_end(self):
+        pass
+
+    def on_array_start(self):
+        pass
+
+    def on_array_end(self):
+        pass
+
+    def on_key(self, key):
+        """
+        :param key: decoded object key
+        """
+        pass
+
+    def on_value(self, value):
+        """
+        :param value: decoded scalar value, i.e. a string, number, bool or None
+        """
+        pass
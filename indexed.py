@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+
+import argparse
+import json
+import os
+import sys
+from array import array
+from decoder import Decoder
+from handler import Handler
+from parser import Parser
+
+
+class IndexedJsonFile:
+    """
+    Random access to elements of an array in a JSON file, through byte offsets of the elements kept in a side index
+    file.
+
+    The index is built by parsing the file once, and is rebuilt when the size or the modification time of the file
+    changes. Elements are then read by seeking to their offsets, and decoded by a fresh parser each.
+    """
+
+    # Format version of index files
+    version = 1
+
+    def __init__(self, path, prefix='', index_path=None):
+        """
+        :param path: path of a JSON file
+        :param prefix: dot separated path of object keys leading to the array; an empty prefix is the root value
+        :param index_path: path of the index file, the JSON file path followed by ".idx" if None
+        """
+        self.path = path
+        self.prefix = prefix
+        self.index_path = index_path if index_path is not None else path + '.idx'
+
+        # Offsets following the opening bracket of the array and the end of every element
+        self.boundaries = self._load_index()
+        if self.boundaries is None:
+            self.boundaries = build_index(path, prefix)
+            self._save_index()
+
+    def __len__(self):
+        return len(self.boundaries) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            if start >= stop:
+                return []
+            data = self._read(self.boundaries[start], self.boundaries[stop])
+            offset = self.boundaries[start]
+            return [
+                self._decode_element(data[self.boundaries[i] - offset:self.boundaries[i + 1] - offset])
+                for i in range(start, stop)
+            ]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Element index out of range")
+
+        return self._decode_element(self._read(self.boundaries[index], self.boundaries[index + 1]))
+
+    def _read(self, start, end):
+        with open(self.path, 'rb') as fp:
+            fp.seek(start)
+            return fp.read(end - start)
+
+    @staticmethod
+    def _decode_element(data):
+        # Data between the end of previous element and the end of this one holds the comma separating them
+        data = data.lstrip(b' \t\n\r')
+        if data[:1] == b',':
+            data = data[1:]
+
+        return Decoder([data], bytes_mode=True).decode()
+
+    def _header(self):
+        stat = os.stat(self.path)
+        return {
+            "version": self.version,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "prefix": self.prefix,
+            "byteorder": sys.byteorder,
+        }
+
+    def _load_index(self):
+        """
+        Load offsets from the index file, or return None if it is missing or out of date.
+        """
+        try:
+            with open(self.index_path, 'rb') as fp:
+                header = json.loads(fp.readline().decode('utf-8'))
+                data = fp.read()
+        except (OSError, ValueError):
+            return None
+
+        if header != self._header():
+            return None
+
+        boundaries = array('q')
+        try:
+            boundaries.frombytes(data)
+        except ValueError:
+            # Truncated index file
+            return None
+        return boundaries
+
+    def _save_index(self):
+        """
+        Write the index file, replacing it at once so that readers never see a partly written one.
+        """
+        temp_path = '{}.{}.tmp'.format(self.index_path, os.getpid())
+        try:
+            with open(temp_path, 'wb') as fp:
+                fp.write(json.dumps(self._header(), separators=(',', ':')).encode('utf-8') + b'\n')
+                fp.write(self.boundaries.tobytes())
+            os.replace(temp_path, self.index_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+
+def build_index(path, prefix='', chunk_size=65536):
+    """
+    Parse a JSON file, finding byte offsets of elements of an array in it.
+
+    Elements are skipped rather than decoded, see Parser.skip().
+
+    :param path: path of a JSON file
+    :param prefix: dot separated path of object keys leading to the array; an empty prefix is the root value
+    :param chunk_size: size of chunks of the file mapped into memory passed to the parser
+    :return: array('q') of the offset following the opening bracket of the array and of the end of every element
+    """
+    parser = Parser(bytes_mode=True)
+    recorder = _OffsetRecorder(parser, prefix.split('.') if prefix else [])
+    parser.handler = recorder
+    for data in Parser.iter_file_chunks(path, chunk_size):
+        parser.feed(data)
+    parser.close()
+
+    if recorder.boundaries is None:
+        raise ValueError("No array at path '{}' in {}".format(prefix, path))
+    return recorder.boundaries
+
+
+class _OffsetRecorder(Handler):
+    """
+    Handler walking down to an array at a path of object keys, skipping everything else, and recording offsets of
+    the array's elements.
+    """
+
+    def __init__(self, parser, prefix):
+        self.parser = parser
+        self.prefix = prefix
+        # Keys leading to current container, and key of a value in it
+        self.path = []
+        self.key = None
+        # Depth of the array being indexed, and whether the end event of a skipped container is expected
+        self.array_depth = None
+        self.skipping = False
+        self.boundaries = None
+
+    def on_object_start(self):
+        self._start_container(False)
+
+    def on_object_end(self):
+        self._end_container()
+
+    def on_array_start(self):
+        self._start_container(True)
+
+    def on_array_end(self):
+        self._end_container()
+
+    def on_key(self, key):
+        self.key = key
+        path = self.path + [key]
+        if self.array_depth is not None or path != self.prefix[:len(path)]:
+            self.parser.skip()
+
+    def on_value(self, value):
+        if self.array_depth == len(self.path):
+            self.boundaries.append(self.parser.value_end)
+
+    def _start_container(self, is_array):
+        if self.array_depth is not None:
+            # Elements of the array, and anything following it, are skipped
+            self.skipping = True
+            self.parser.skip()
+            return
+
+        # Keys of containers walked into all lead to the array, see on_key()
+        path = self.path if self.key is None else self.path + [self.key]
+        if is_array and path != self.prefix:
+            self.skipping = True
+            self.parser.skip()
+            return
+
+        self.path = path
+        self.key = None
+        if is_array:
+            self.array_depth = len(path)
+            self.boundaries = array('q', [self.parser.index])
+
+    def _end_container(self):
+        if self.skipping:
+            self.skipping = False
+            if self.array_depth == len(self.path):
+                self.boundaries.append(self.parser.value_end)
+            return
+
+        if self.array_depth == len(self.path):
+            # Only the first array at the path is indexed
+            self.array_depth = -1
+        elif self.path:
+            self.path.pop()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Build an index of array elements of a JSON file, or read "
+                                                     "elements through it.")
+    arg_parser.add_argument('path', help="path of a JSON file")
+    arg_parser.add_argument('--prefix', default='', help="dot separated object keys leading to the array")
+    arg_parser.add_argument('--index', help="path of the index file")
+    arg_parser.add_argument('elements', nargs='*', type=int, help="indices of elements to print")
+    args = arg_parser.parse_args()
+
+    indexed = IndexedJsonFile(args.path, args.prefix, args.index)
+    if not args.elements:
+        print("{} elements indexed in {}".format(len(indexed), indexed.index_path))
+    for index in args.elements:
+        print(json.dumps(indexed[index], ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+
+import mmap
+import os
+import re
+from collections.abc import Mapping, Sequence
+from decoder import Decoder
+from exceptions import ParseError
+from parser import Parser
+
+
+class LazyDecoder:
+    """
+    Decoder returning proxies of objects and arrays, which decode their values only when they are accessed.
+
+    A single structural pass over data records where every object and array ends, so that values not accessed are
+    only scanned for brackets and string boundaries. Accessed values are decoded by a parser and cached in their
+    proxies; they are validated only then.
+    """
+
+    whitespace_run = re.compile(r'[ \t\n\r]*')
+    str_literal = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+    # Anything up to a char delimiting values, to be validated by the parser
+    scalar_literal = re.compile(r'[^ \t\n\r,:\[\]{}"]+')
+
+    bytes_whitespace_run = re.compile(whitespace_run.pattern.encode())
+    bytes_str_literal = re.compile(str_literal.pattern.encode(), re.DOTALL)
+    bytes_scalar_literal = re.compile(scalar_literal.pattern.encode())
+
+    def __init__(self, data):
+        """
+        :param data: str, or UTF-8 encoded bytes-like object such as bytes or mmap
+        """
+        self.data = data
+        self.bytes_mode = not isinstance(data, str)
+        if self.bytes_mode:
+            # Patterns and chars compared with data have to be of the same type as data
+            self.whitespace_run = self.bytes_whitespace_run
+            self.str_literal = self.bytes_str_literal
+            self.scalar_literal = self.bytes_scalar_literal
+            self.structure_run = Parser.bytes_skip_run
+            self.chars = {ch: ch.encode() for ch in '{}[],:" '}
+        else:
+            self.structure_run = Parser.skip_run
+            self.chars = {ch: ch for ch in '{}[],:" '}
+
+        # Offsets of closing brackets by offsets of opening ones
+        self.ends = {}
+        # Decoder of slices of data, parsing them as a stream of values
+        self.decoder = None
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        Make a lazy decoder of file mapped into memory.
+
+        :param path: file path
+        """
+        with open(path, 'rb') as fp:
+            if os.fstat(fp.fileno()).st_size == 0:
+                return cls(b'')
+            return cls(mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def decode(self):
+        """
+        Index data and return its root value, a LazyObject or LazyArray proxy if it is an object or an array.
+        """
+        self._index_structure()
+
+        start = self._skip_whitespace(0)
+        if self.data[start:start + 1] in [self.chars['{'], self.chars['[']]:
+            end = self.ends[start] + 1
+            if self._skip_whitespace(end) != len(self.data):
+                self._raise_parse_error(end)
+            return self._value(start, end)
+
+        return self._decode_slice(start, len(self.data))
+
+    def _index_structure(self):
+        """
+        Find closing brackets of all objects and arrays, jumping over strings and other chars at once.
+        """
+        data = self.data
+        chars = self.chars
+        structure_run = self.structure_run
+        ends = self.ends
+        # Offsets and closing brackets of objects and arrays being indexed
+        opened = []
+        pos = 0
+
+        while True:
+            match = structure_run.match(data, pos)
+            pos = match.end()
+            if match.lastindex is None:
+                break
+            if match.lastindex == 1:
+                raise ParseError("Parse error: unterminated string at index {}".format(pos - 1))
+
+            if match.lastindex == 2:
+                opened.append((pos - 1, chars['}'] if match.group(2) == chars['{'] else chars[']']))
+            elif not opened or opened[-1][1] != match.group(3):
+                self._raise_parse_error(pos - 1)
+            else:
+                ends[opened.pop()[0]] = pos - 1
+
+        if opened:
+            raise ParseError("Parse error: unclosed bracket at index {}".format(opened[-1][0]))
+
+    def _index_array(self, start, end):
+        """
+        Find (start, end) offsets of array elements, given offsets of its brackets.
+        """
+        spans = []
+        pos = self._skip_whitespace(start + 1)
+        if pos == end:
+            return spans
+
+        while True:
+            value_end = self._value_end(pos)
+            spans.append((pos, value_end))
+            pos = self._skip_delimiter(value_end, end)
+            if pos == end:
+                return spans
+
+    def _index_object(self, start, end):
+        """
+        Find (start, end) offsets of object values by keys, given offsets of its brackets.
+        """
+        spans = {}
+        chars = self.chars
+        pos = self._skip_whitespace(start + 1)
+        if pos == end:
+            return spans
+
+        while True:
+            match = self.str_literal.match(self.data, pos)
+            if match is None:
+                self._raise_parse_error(pos)
+            key = self._decode_slice(pos, match.end())
+
+            pos = self._skip_whitespace(match.end())
+            if self.data[pos:pos + 1] != chars[':']:
+                self._raise_parse_error(pos)
+            pos = self._skip_whitespace(pos + 1)
+
+            value_end = self._value_end(pos)
+            spans[key] = (pos, value_end)
+            pos = self._skip_delimiter(value_end, end)
+            if pos == end:
+                return spans
+
+    def _value_end(self, pos):
+        """
+        Find where a value starting at pos ends.
+        """
+        ch = self.data[pos:pos + 1]
+        if ch in [self.chars['{'], self.chars['[']]:
+            return self.ends[pos] + 1
+
+        match = (self.str_literal if ch == self.chars['"'] else self.scalar_literal).match(self.data, pos)
+        if match is None:
+            self._raise_parse_error(pos)
+        return match.end()
+
+    def _skip_delimiter(self, pos, end):
+        """
+        Skip a comma and whitespace around it following a value, returning offset of next value, or the closing
+        bracket at end if the value is the last one.
+        """
+        pos = self._skip_whitespace(pos)
+        if pos == end:
+            return pos
+        if self.data[pos:pos + 1] != self.chars[',']:
+            self._raise_parse_error(pos)
+
+        pos = self._skip_whitespace(pos + 1)
+        if pos == end:
+            self._raise_parse_error(pos)
+        return pos
+
+    def _skip_whitespace(self, pos):
+        return self.whitespace_run.match(self.data, pos).end()
+
+    def _value(self, start, end):
+        """
+        Make a proxy of an object or an array, or decode a scalar value.
+        """
+        ch = self.data[start:start + 1]
+        if ch == self.chars['{']:
+            return LazyObject(self, start, end)
+        if ch == self.chars['[']:
+            return LazyArray(self, start, end)
+        return self._decode_slice(start, end)
+
+    def _decode_slice(self, start, end):
+        """
+        Decode a single value from data slice.
+        """
+        if self.decoder is None:
+            self.decoder = Decoder(None, bytes_mode=self.bytes_mode)
+            self.decoder.parser.multi_document = True
+            self.decoder.prefix = []
+
+        decoder = self.decoder
+        try:
+            decoder.parser.feed(self.data[start:end])
+            # Numbers are ended by whitespace
+            decoder.parser.feed(self.chars[' '])
+        except ParseError:
+            # Parser state is broken after an error
+            self.decoder = None
+            raise
+
+        if len(decoder.items) != 1:
+            self.decoder = None
+            raise ParseError("Parse error: incomplete value at index {}".format(start))
+
+        return decoder.items.pop()
+
+    def _raise_parse_error(self, pos):
+        ch = self.data[pos:pos + 1]
+        if ch.__class__ is memoryview:
+            ch = ch.tobytes()
+        raise ParseError("Parse error: unexpected char {!r} at index {}".format(ch, pos))
+
+
+class LazyObject(Mapping):
+    """
+    Read-only mapping proxy of an object, indexing its keys on first access and decoding values when accessed.
+    """
+
+    def __init__(self, decoder, start, end):
+        """
+        :param decoder: LazyDecoder of data holding the object
+        :param start: offset of opening bracket
+        :param end: offset following closing bracket
+        """
+        self._decoder = decoder
+        self._start = start
+        self._end = end
+        self._spans = None
+        self._values = {}
+
+    def __getitem__(self, key):
+        values = self._values
+        if key not in values:
+            values[key] = self._decoder._value(*self._index()[key])
+        return values[key]
+
+    def __contains__(self, key):
+        # Mapping.__contains__() would decode the value
+        return key in self._index()
+
+    def __iter__(self):
+        return iter(self._index())
+
+    def __len__(self):
+        return len(self._index())
+
+    def __repr__(self):
+        return "LazyObject({}..{})".format(self._start, self._end)
+
+    def to_python(self):
+        """
+        Decode the whole object into a dict.
+        """
+        return self._decoder._decode_slice(self._start, self._end)
+
+    def _index(self):
+        if self._spans is None:
+            self._spans = self._decoder._index_object(self._start, self._end - 1)
+        return self._spans
+
+
+class LazyArray(Sequence):
+    """
+    Read-only sequence proxy of an array, indexing its elements on first access and decoding them when accessed.
+    """
+
+    # Placeholder of elements not decoded yet
+    _missing = object()
+
+    def __init__(self, decoder, start, end):
+        """
+        :param decoder: LazyDecoder of data holding the array
+        :param start: offset of opening bracket
+        :param end: offset following closing bracket
+        """
+        self._decoder = decoder
+        self._start = start
+        self._end = end
+        self._spans = None
+        self._values = None
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        spans = self._index()
+        value = self._values[index]
+        if value is self._missing:
+            value = self._values[index] = self._decoder._value(*spans[index])
+        return value
+
+    def __len__(self):
+        return len(self._index())
+
+    def __repr__(self):
+        return "LazyArray({}..{})".format(self._start, self._end)
+
+    def to_python(self):
+        """
+        Decode the whole array into a list.
+        """
+        return self._decoder._decode_slice(self._start, self._end)
+
+    def _index(self):
+        if self._spans is None:
+            self._spans = self._decoder._index_array(self._start, self._end - 1)
+            self._values = [self._missing] * len(self._spans)
+        return self._spans
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+from array import array
+from columns import MAX_EXACT_FLOAT_INT
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# Kinds of typed arrays arrays of numbers are decoded into
+ARRAY = 'array'
+NUMPY = 'numpy'
+
+
+def check_kind(kind):
+    """
+    Check that arrays of numbers can be decoded into typed arrays of kind.
+
+    :param kind: ARRAY, NUMPY or None
+    """
+    if kind not in [None, ARRAY, NUMPY]:
+        raise ValueError("Unsupported kind of numeric arrays '{}'".format(kind))
+    if kind == NUMPY and numpy is None:
+        raise ImportError("NumPy is required for numeric arrays of kind '{}'".format(kind))
+
+
+def is_typed_array(value):
+    """
+    Check if value is a typed array made by array_from_tokens().
+    """
+    return value.__class__ is array or numpy is not None and value.__class__ is numpy.ndarray
+
+
+def array_from_tokens(tokens, is_float, kind):
+    """
+    Convert numeric literal tokens into a typed array in a single batch.
+
+    :param tokens: list of str or bytes numeric literals, possibly surrounded by whitespace, or of ints and floats
+    :param is_float: whether some of the literals have a fraction or an exponent
+    :param kind: ARRAY or NUMPY
+    :return: array('d') of floats or array('q') of integers, or numpy.ndarray sharing its buffer; None if some
+        integer does not fit in 64 bits, or would not be converted to a float exactly
+    """
+    try:
+        values = array('d', map(float, tokens)) if is_float else array('q', map(int, tokens))
+    except OverflowError:
+        return None
+
+    if is_float and values and (max(values) >= MAX_EXACT_FLOAT_INT or min(values) <= -MAX_EXACT_FLOAT_INT):
+        if _has_inexact_int(tokens, values):
+            return None
+
+    return values if kind == ARRAY else numpy.frombuffer(values, values.typecode)
+
+
+def _has_inexact_int(tokens, values):
+    """
+    Check if some integer literal among tokens has lost precision when converted to a float value.
+    """
+    for token, value in zip(tokens, values):
+        if -MAX_EXACT_FLOAT_INT < value < MAX_EXACT_FLOAT_INT or token.__class__ is float:
+            continue
+        try:
+            integer = int(token)
+        except ValueError:
+            # Literal with a fraction or an exponent
+            continue
+        if not -MAX_EXACT_FLOAT_INT <= integer <= MAX_EXACT_FLOAT_INT:
+            return True
+
+    return False
+
+
+def array_from_list(values, kind):
+    """
+    Convert list of values into a typed array, if it is a non-empty list of numbers only.
+
+    :param values: list of decoded values
+    :param kind: ARRAY or NUMPY
+    :return: typed array as array_from_tokens() makes it, or None if values are not all numbers
+    """
+    if not values:
+        return None
+
+    is_float = False
+    for value in values:
+        if value.__class__ is float:
+            is_float = True
+        elif value.__class__ is not int:
+            return None
+
+    return array_from_tokens(values, is_float, kind)
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from decoder import Decoder
+
+
+def decode_ndjson_parallel(path_or_stream, workers=None, ordered=True, range_size=8 * 1024 * 1024):
+    """
+    Decode NDJSON in a pool of worker processes, yielding decoded documents.
+
+    Input is split into newline-aligned ranges, each of them decoded by a worker with its own parser.
+
+    :param path_or_stream: path of a file, or a binary or text stream to read from
+    :param workers: count of worker processes, CPU count if None
+    :param ordered: yield documents in input order, or those of every range as soon as it is decoded
+    :param range_size: size of a range in bytes, extended up to the end of its last line
+    """
+    if isinstance(path_or_stream, (str, bytes, os.PathLike)):
+        tasks = (
+            (_decode_file_range, path_or_stream, start, end)
+            for start, end in _file_ranges(path_or_stream, range_size)
+        )
+    else:
+        tasks = ((_decode_range, data) for data in _stream_ranges(path_or_stream, range_size))
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(workers) as executor:
+        # Only a couple of ranges per worker are in flight, so that decoded documents do not pile up in memory
+        pending = deque()
+        for task in tasks:
+            pending.append(executor.submit(*task))
+            if len(pending) >= 2 * workers:
+                yield from _take_documents(pending, ordered)
+
+        while pending:
+            yield from _take_documents(pending, ordered)
+
+
+def _take_documents(pending, ordered):
+    """
+    Wait for the first pending range, or for any of them if not ordered, and take its documents.
+    """
+    if ordered:
+        yield from pending.popleft().result()
+        return
+
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    for future in done:
+        pending.remove(future)
+        yield from future.result()
+
+
+def _file_ranges(path, range_size):
+    """
+    Split a file into newline-aligned (start, end) ranges.
+    """
+    with open(path, 'rb') as fp:
+        size = os.fstat(fp.fileno()).st_size
+        start = 0
+        while start < size:
+            fp.seek(start + range_size)
+            fp.readline()
+            end = min(fp.tell(), size)
+            yield start, end
+            start = end
+
+
+def _stream_ranges(stream, range_size):
+    """
+    Read a stream in newline-aligned ranges.
+    """
+    while True:
+        data = stream.read(range_size)
+        if not data:
+            return
+        yield data + stream.readline()
+
+
+def _decode_file_range(path, start, end):
+    with open(path, 'rb') as fp:
+        fp.seek(start)
+        data = fp.read(end - start)
+
+    return _decode_range(data)
+
+
+def _decode_range(data):
+    return list(Decoder([data]).iter_documents())
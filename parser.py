@@ -1,13 +1,21 @@
 # -*- coding: utf-8 -*-
 
+import codecs
 import json
-from enum import Enum, auto
+import mmap
+import os
+import re
+import sys
+from collections import OrderedDict
+from enum import Enum, IntEnum, auto
 from exceptions import ParseError
 from functools import partial
+from handler import Handler
+from numeric_arrays import array_from_tokens, check_kind
 
 
 class Parser:
-    class State(Enum):
+    class State(IntEnum):
         OK = auto()
         FINISH = auto()
         OBJECT = auto()
@@ -62,6 +70,9 @@ class Parser:
         NEGATIVE_INFINITY_N2 = auto()
         NEGATIVE_INFINITY_I3 = auto()
         NEGATIVE_INFINITY_T = auto()
+        SKIP = auto()
+        SKIP_STR = auto()
+        SKIP_STR_ESC = auto()
 
     class Mode(Enum):
         DONE = auto()
@@ -69,7 +80,7 @@ class Parser:
         ARRAY = auto()
         KEY = auto()
 
-    class CharClass(Enum):
+    class CharClass(IntEnum):
         CONTROL = auto()
         SPACE = auto()
         WHITESPACE = auto()
@@ -110,6 +121,9 @@ class Parser:
 
     class_map = {
         ' ': CharClass.SPACE,
+        '\t': CharClass.WHITESPACE,
+        '\n': CharClass.WHITESPACE,
+        '\r': CharClass.WHITESPACE,
         '{': CharClass.LEFT_CURVED_BRACKET,
         '}': CharClass.RIGHT_CURVED_BRACKET,
         '[': CharClass.LEFT_SQUARE_BRACKET,
@@ -156,71 +170,209 @@ class Parser:
         'y': CharClass.LOW_Y,
     }
 
+    # Char class codes indexed by ASCII code, any other char is of ETC class
+    ascii_char_classes = [int(CharClass.CONTROL)] * 32 + [int(CharClass.ETC)] * 96
+    for ch, char_class in class_map.items():
+        ascii_char_classes[ord(ch)] = int(char_class)
+    del ch, char_class
+
+    # Char class codes indexed by byte, bytes of multibyte UTF-8 sequences are of ETC class
+    byte_char_classes = ascii_char_classes + [int(CharClass.ETC)] * 128
+
+    # Row length of flat transition table
+    class_count = max(CharClass) + 1
+
+    # Chars which interrupt an unescaped run inside a string literal
+    str_literal_stop_chars = re.compile(r'["\\\x00-\x1f]')
+
+    # Complete numeric literal, i.e. one followed by a char which cannot continue it
+    numeric_literal = re.compile(r'-?(?:0|[1-9][0-9]*)(\.[0-9]+)?([eE][-+]?[0-9]+)?(?=[ \t\n\r,\]}])')
+
+    whitespace_run = re.compile(r'[ \t\n\r]*')
+
+    # Skipped data up to a quote of a string which does not end in chunk, an opening bracket, a closing bracket
+    # or, when skipping a single value, a comma
+    skip_run = re.compile(r'(?:[^"\[\]{}]+|"[^"\\]*(?:\\.[^"\\]*)*")*(?:(")|([\[{])|([\]}]))?', re.DOTALL)
+    skip_value_run = re.compile(r'(?:[^"\[\]{},]+|"[^"\\]*(?:\\.[^"\\]*)*")*(?:(")|([\[{])|([\]}])|(,))?', re.DOTALL)
+
+    # Chars which matter inside a skipped string: quote and backslash
+    skip_str_stop_chars = re.compile(r'(")|(\\)')
+
+    bytes_str_literal_stop_chars = re.compile(str_literal_stop_chars.pattern.encode())
+    bytes_numeric_literal = re.compile(numeric_literal.pattern.encode())
+    bytes_whitespace_run = re.compile(whitespace_run.pattern.encode())
+    bytes_skip_run = re.compile(skip_run.pattern.encode(), re.DOTALL)
+    bytes_skip_value_run = re.compile(skip_value_run.pattern.encode(), re.DOTALL)
+    bytes_skip_str_stop_chars = re.compile(skip_str_stop_chars.pattern.encode())
+
+    # Rest of an array holding numbers only, following its "[", and chars found only in float literals
+    numeric_array = re.compile(
+        r'[ \t\n\r]*{number}(?:[ \t\n\r]*,[ \t\n\r]*{number})*[ \t\n\r]*\]'.format(
+            number=r'-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?'
+        )
+    )
+    float_chars = re.compile(r'[.eE]')
+
+    bytes_numeric_array = re.compile(numeric_array.pattern.encode())
+    bytes_float_chars = re.compile(float_chars.pattern.encode())
+
+    # Values of integer literals looked up before converting them with int()
+    small_ints = {str(i): i for i in range(-999, 1000)}
+    bytes_small_ints = {str(i).encode(): i for i in range(-999, 1000)}
+
+    # Values of constant literals pushed without a parse_constant hook
+    constants = {name: float(name) for name in ['-Infinity', 'Infinity', 'NaN']}
+
+    # Format version of checkpoint() blobs
+    checkpoint_version = 1
+
     def get_char_class(self, ch):
-        char_class = self.class_map.get(ch, None)
-        if char_class is not None:
-            return char_class
-        if ch.isspace():
-            return self.CharClass.WHITESPACE
-        if ord(ch) < 32:
-            return self.CharClass.CONTROL
+        code = ord(ch)
+        if code < 128:
+            return self.CharClass(self.ascii_char_classes[code])
         return self.CharClass.ETC
 
-    def __init__(self):
+    def __init__(self, handler=None, bytes_mode=False, multi_document=False, key_cache_size=1024, value_cache_size=0,
+                 value_cache_max_length=16, parse_int=None, parse_float=None, parse_constant=None,
+                 numeric_arrays=None):
+        """
+        :param handler: Handler receiving events pushed with feed() and close()
+        :param bytes_mode: run on UTF-8 encoded chunks as they are, decoding only string tokens
+        :param multi_document: parse a stream of top-level values separated by whitespace or RS chars, as in
+            NDJSON, concatenated JSON or JSON text sequences (RFC 7464)
+        :param key_cache_size: count of most recently used object keys kept decoded and interned, 0 disables
+            the cache
+        :param value_cache_size: count of most recently used string values kept decoded, 0 disables the cache
+        :param value_cache_max_length: maximum length of raw string value tokens looked up in the value cache
+        :param parse_int: called with the str of every integer literal, as in json.loads(), int() if None
+        :param parse_float: called with the str of every float literal, e.g. decimal.Decimal, float() if None
+        :param parse_constant: called with "-Infinity", "Infinity" or "NaN" for every occurrence of these
+            literals, as in json.loads(), float() if None
+        :param numeric_arrays: push arrays of numbers only, which a data chunk holds completely, as a single value
+            of typed array: "array" for array('d') or array('q'), "numpy" for numpy.ndarray, None to push array
+            events as for other arrays
+        """
+
         self.state = self.State.ELEM_START
         self.index = 0
+        self.local_index = 0
+        # Count of data fed so far, in bytes or chars depending on the type of chunks
+        self.offset = 0
         self.stack = [self.Mode.DONE]
-        self.token = ''
+        # Current token starts at token_start in current chunk, preceded by token_parts of previous chunks
+        self.token_start = None
+        self.token_parts = []
+        # Strings and numbers are only validated while off, and pushed as None
+        self.materialize = True
+        self.multi_document = multi_document
+        # Decoded keys by raw key tokens, least recently used first
+        self.key_cache = OrderedDict()
+        self.key_cache_size = key_cache_size
+        # Decoded short string values by raw tokens, least recently used first, and lookup counters
+        self.value_cache = OrderedDict()
+        self.value_cache_size = value_cache_size
+        self.value_cache_max_length = value_cache_max_length
+        self.value_cache_hits = 0
+        self.value_cache_misses = 0
+        # Bracket depth inside skipped data, and whether a single value is skipped rather than container contents
+        self.skip_depth = 0
+        self.skip_value = False
+        self.bytes_mode = bytes_mode
+        if bytes_mode:
+            # Patterns run on data chunks have to be of the same type as chunks
+            self.str_literal_stop_chars = self.bytes_str_literal_stop_chars
+            self.numeric_literal = self.bytes_numeric_literal
+            self.whitespace_run = self.bytes_whitespace_run
+            self.skip_run = self.bytes_skip_run
+            self.skip_value_run = self.bytes_skip_value_run
+            self.skip_str_stop_chars = self.bytes_skip_str_stop_chars
+            self.small_ints = self.bytes_small_ints
+            self.numeric_array = self.bytes_numeric_array
+            self.float_chars = self.bytes_float_chars
+            self.data = b''
+            self.empty_token = b''
+        else:
+            self.data = ''
+            self.empty_token = ''
+        # Keeps an incomplete multibyte char at the end of a bytes chunk until next chunk
+        self.utf8_decoder = codecs.getincrementaldecoder('utf-8')()
+        self.handler = handler if handler is not None else Handler()
+
+        # Literal tokens converted by hooks are passed to them as str
+        if parse_int is not None:
+            self.small_ints = {}
+        check_kind(numeric_arrays)
+        if numeric_arrays is not None and (parse_int is not None or parse_float is not None):
+            raise ValueError("numeric_arrays cannot be combined with parse_int or parse_float")
+        self.numeric_arrays = numeric_arrays
+        self.parse_int = self._number_hook(parse_int, int)
+        self.parse_float = self._number_hook(parse_float, float)
+        self.parse_constant = parse_constant
+
+        skip_transitions = {
+            char_class: self._skip_transition
+            for char_class in self.CharClass if char_class != self.CharClass.END_OF_DATA
+        }
 
         value_transitions = {
             self.CharClass.SPACE: self.State.ELEM_START,
-            self.CharClass.WHITESPACE: self.State.ELEM_START,
+            self.CharClass.WHITESPACE: self._whitespace_run_transition(self.State.ELEM_START),
             self.CharClass.LEFT_CURVED_BRACKET: self._left_curved_bracket_transition,
             self.CharClass.LEFT_SQUARE_BRACKET: self._left_square_bracket_transition,
             self.CharClass.QUOTE: self.State.STR_LITERAL,
-            self.CharClass.I: self.State.POSITIVE_INFINITY_I,
-            self.CharClass.N: self.State.NAN_LITERAL_N,
-            self.CharClass.ZERO: self._transition_with_token_accum(self.State.INT_ZERO_LITERAL),
-            self.CharClass.DIGIT: self._transition_with_token_accum(self.State.INT_LITERAL),
-            self.CharClass.MINUS: self._transition_with_token_accum(self.State.NEG_LITERAL),
-            self.CharClass.LOW_N: self.State.NULL_LITERAL_N,
-            self.CharClass.LOW_T: self.State.TRUE_LITERAL_T,
-            self.CharClass.LOW_F: self.State.FALSE_LITERAL_F,
+            self.CharClass.I: self._named_literal_transition(self.State.POSITIVE_INFINITY_I, 'Infinity'),
+            self.CharClass.N: self._named_literal_transition(self.State.NAN_LITERAL_N, 'NaN'),
+            self.CharClass.ZERO: self._numeric_literal_transition(self.State.INT_ZERO_LITERAL),
+            self.CharClass.DIGIT: self._numeric_literal_transition(self.State.INT_LITERAL),
+            self.CharClass.MINUS: self._numeric_literal_transition(self.State.NEG_LITERAL),
+            self.CharClass.LOW_N: self._named_literal_transition(self.State.NULL_LITERAL_N, 'null', None),
+            self.CharClass.LOW_T: self._named_literal_transition(self.State.TRUE_LITERAL_T, 'true', True),
+            self.CharClass.LOW_F: self._named_literal_transition(self.State.FALSE_LITERAL_F, 'false', False),
         }
 
+        # Chars starting another top-level value after the previous one
+        next_document_transitions = {
+            char_class: self._next_document_transition
+            for char_class in value_transitions if char_class not in [self.CharClass.SPACE, self.CharClass.WHITESPACE]
+        }
+        next_document_transitions[self.CharClass.CONTROL] = self._record_separator_transition
+
+        root_transitions = dict(value_transitions)
+        root_transitions[self.CharClass.CONTROL] = self._record_separator_transition
+
         array_transitions = dict(value_transitions)
         array_transitions[self.CharClass.RIGHT_SQUARE_BRACKET] = self._right_square_bracket_transition
         array_transitions[self.CharClass.SPACE] = self.State.ARRAY
-        array_transitions[self.CharClass.WHITESPACE] = self.State.ARRAY
+        array_transitions[self.CharClass.WHITESPACE] = self._whitespace_run_transition(self.State.ARRAY)
 
         self.transition_table = {
-            self.State.ELEM_START: value_transitions,
+            self.State.ELEM_START: root_transitions,
             self.State.ARRAY: array_transitions,
             self.State.OBJECT: {
                 self.CharClass.SPACE: self.State.OBJECT,
-                self.CharClass.WHITESPACE: self.State.OBJECT,
+                self.CharClass.WHITESPACE: self._whitespace_run_transition(self.State.OBJECT),
                 self.CharClass.RIGHT_CURVED_BRACKET: self._empty_right_curved_bracket_transition,
                 self.CharClass.QUOTE: self.State.STR_LITERAL,
             },
             self.State.COLON: {
                 self.CharClass.SPACE: self.State.COLON,
-                self.CharClass.WHITESPACE: self.State.COLON,
+                self.CharClass.WHITESPACE: self._whitespace_run_transition(self.State.COLON),
                 self.CharClass.COLON: self._colon_transition,
             },
             self.State.NEG_LITERAL: {
-                self.CharClass.ZERO: self._transition_with_token_accum(self.State.INT_ZERO_LITERAL),
-                self.CharClass.DIGIT: self._transition_with_token_accum(self.State.INT_LITERAL),
-                self.CharClass.I: self.State.NEGATIVE_INFINITY_I,
+                self.CharClass.ZERO: self.State.INT_ZERO_LITERAL,
+                self.CharClass.DIGIT: self.State.INT_LITERAL,
+                self.CharClass.I: self._negative_infinity_transition,
             },
             self.State.INT_LITERAL: {
                 self.CharClass.SPACE: self._numeric_literal_whitespace_transition,
                 self.CharClass.WHITESPACE: self._numeric_literal_whitespace_transition,
-                self.CharClass.ZERO: self._transition_with_token_accum(self.State.INT_LITERAL),
-                self.CharClass.DIGIT: self._transition_with_token_accum(self.State.INT_LITERAL),
-                self.CharClass.POINT: self._transition_with_token_accum(self.State.FLOAT_SEPARATOR),
+                self.CharClass.ZERO: self.State.INT_LITERAL,
+                self.CharClass.DIGIT: self.State.INT_LITERAL,
+                self.CharClass.POINT: self.State.FLOAT_SEPARATOR,
                 self.CharClass.COMMA: self._comma_transition,
-                self.CharClass.E: self._transition_with_token_accum(self.State.EXP_SEPARATOR),
-                self.CharClass.LOW_E: self._transition_with_token_accum(self.State.EXP_SEPARATOR),
+                self.CharClass.E: self.State.EXP_SEPARATOR,
+                self.CharClass.LOW_E: self.State.EXP_SEPARATOR,
                 self.CharClass.RIGHT_CURVED_BRACKET: self._right_curved_bracket_transition,
                 self.CharClass.RIGHT_SQUARE_BRACKET: self._right_square_bracket_transition,
                 self.CharClass.END_OF_DATA: self._end_of_data_transition,
@@ -228,162 +380,164 @@ class Parser:
             self.State.INT_ZERO_LITERAL: {
                 self.CharClass.SPACE: self._numeric_literal_whitespace_transition,
                 self.CharClass.WHITESPACE: self._numeric_literal_whitespace_transition,
-                self.CharClass.POINT: self._transition_with_token_accum(self.State.FLOAT_SEPARATOR),
+                self.CharClass.POINT: self.State.FLOAT_SEPARATOR,
                 self.CharClass.COMMA: self._comma_transition,
+                self.CharClass.E: self.State.EXP_SEPARATOR,
+                self.CharClass.LOW_E: self.State.EXP_SEPARATOR,
                 self.CharClass.RIGHT_CURVED_BRACKET: self._right_curved_bracket_transition,
                 self.CharClass.RIGHT_SQUARE_BRACKET: self._right_square_bracket_transition,
                 self.CharClass.END_OF_DATA: self._end_of_data_transition,
             },
             self.State.FLOAT_SEPARATOR: {
-                self.CharClass.ZERO: self._transition_with_token_accum(self.State.FLOAT_LITERAL),
-                self.CharClass.DIGIT: self._transition_with_token_accum(self.State.FLOAT_LITERAL),
+                self.CharClass.ZERO: self.State.FLOAT_LITERAL,
+                self.CharClass.DIGIT: self.State.FLOAT_LITERAL,
             },
             self.State.FLOAT_LITERAL: {
                 self.CharClass.SPACE: self._numeric_literal_whitespace_transition,
                 self.CharClass.WHITESPACE: self._numeric_literal_whitespace_transition,
-                self.CharClass.ZERO: self._transition_with_token_accum(self.State.FLOAT_LITERAL),
-                self.CharClass.DIGIT: self._transition_with_token_accum(self.State.FLOAT_LITERAL),
-                self.CharClass.E: self._transition_with_token_accum(self.State.EXP_SEPARATOR),
-                self.CharClass.LOW_E: self._transition_with_token_accum(self.State.EXP_SEPARATOR),
+                self.CharClass.ZERO: self.State.FLOAT_LITERAL,
+                self.CharClass.DIGIT: self.State.FLOAT_LITERAL,
+                self.CharClass.E: self.State.EXP_SEPARATOR,
+                self.CharClass.LOW_E: self.State.EXP_SEPARATOR,
                 self.CharClass.COMMA: self._comma_transition,
                 self.CharClass.RIGHT_CURVED_BRACKET: self._right_curved_bracket_transition,
                 self.CharClass.RIGHT_SQUARE_BRACKET: self._right_square_bracket_transition,
                 self.CharClass.END_OF_DATA: self._end_of_data_transition,
             },
             self.State.EXP_SEPARATOR: {
-                self.CharClass.ZERO: self._transition_with_token_accum(self.State.EXP_LITERAL),
-                self.CharClass.DIGIT: self._transition_with_token_accum(self.State.EXP_LITERAL),
-                self.CharClass.MINUS: self._transition_with_token_accum(self.State.EXP_SIGN),
-                self.CharClass.PLUS: self._transition_with_token_accum(self.State.EXP_SIGN),
+                self.CharClass.ZERO: self.State.EXP_LITERAL,
+                self.CharClass.DIGIT: self.State.EXP_LITERAL,
+                self.CharClass.MINUS: self.State.EXP_SIGN,
+                self.CharClass.PLUS: self.State.EXP_SIGN,
             },
             self.State.EXP_SIGN: {
-                self.CharClass.ZERO: self._transition_with_token_accum(self.State.EXP_LITERAL),
-                self.CharClass.DIGIT: self._transition_with_token_accum(self.State.EXP_LITERAL),
+                self.CharClass.ZERO: self.State.EXP_LITERAL,
+                self.CharClass.DIGIT: self.State.EXP_LITERAL,
             },
             self.State.EXP_LITERAL: {
                 self.CharClass.SPACE: self._numeric_literal_whitespace_transition,
                 self.CharClass.WHITESPACE: self._numeric_literal_whitespace_transition,
-                self.CharClass.ZERO: self._transition_with_token_accum(self.State.EXP_LITERAL),
-                self.CharClass.DIGIT: self._transition_with_token_accum(self.State.EXP_LITERAL),
+                self.CharClass.ZERO: self.State.EXP_LITERAL,
+                self.CharClass.DIGIT: self.State.EXP_LITERAL,
                 self.CharClass.COMMA: self._comma_transition,
                 self.CharClass.RIGHT_CURVED_BRACKET: self._right_curved_bracket_transition,
                 self.CharClass.RIGHT_SQUARE_BRACKET: self._right_square_bracket_transition,
                 self.CharClass.END_OF_DATA: self._end_of_data_transition,
             },
             self.State.STR_LITERAL: {
-                self.CharClass.SPACE: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.LEFT_CURVED_BRACKET: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.RIGHT_CURVED_BRACKET: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.LEFT_SQUARE_BRACKET: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.RIGHT_SQUARE_BRACKET: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.COLON: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.COMMA: self._transition_with_token_accum(self.State.STR_LITERAL),
+                self.CharClass.SPACE: self.State.STR_LITERAL,
+                self.CharClass.LEFT_CURVED_BRACKET: self.State.STR_LITERAL,
+                self.CharClass.RIGHT_CURVED_BRACKET: self.State.STR_LITERAL,
+                self.CharClass.LEFT_SQUARE_BRACKET: self.State.STR_LITERAL,
+                self.CharClass.RIGHT_SQUARE_BRACKET: self.State.STR_LITERAL,
+                self.CharClass.COLON: self.State.STR_LITERAL,
+                self.CharClass.COMMA: self.State.STR_LITERAL,
                 self.CharClass.QUOTE: self._quote_transition,
-                self.CharClass.BACKSLASH: self._transition_with_token_accum(self.State.STR_LITERAL_ESC),
-                self.CharClass.SLASH: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.PLUS: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.MINUS: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.POINT: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.ZERO: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.DIGIT: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.LOW_A: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.LOW_B: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.LOW_C: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.LOW_D: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.LOW_E: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.E: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.LOW_F: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.LOW_I: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.I: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.LOW_L: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.LOW_N: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.N: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.LOW_R: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.LOW_S: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.LOW_T: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.LOW_U: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.LOW_Y: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.ABCDF: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.ETC: self._transition_with_token_accum(self.State.STR_LITERAL),
+                self.CharClass.BACKSLASH: self.State.STR_LITERAL_ESC,
+                self.CharClass.SLASH: self.State.STR_LITERAL,
+                self.CharClass.PLUS: self.State.STR_LITERAL,
+                self.CharClass.MINUS: self.State.STR_LITERAL,
+                self.CharClass.POINT: self.State.STR_LITERAL,
+                self.CharClass.ZERO: self.State.STR_LITERAL,
+                self.CharClass.DIGIT: self.State.STR_LITERAL,
+                self.CharClass.LOW_A: self.State.STR_LITERAL,
+                self.CharClass.LOW_B: self.State.STR_LITERAL,
+                self.CharClass.LOW_C: self.State.STR_LITERAL,
+                self.CharClass.LOW_D: self.State.STR_LITERAL,
+                self.CharClass.LOW_E: self.State.STR_LITERAL,
+                self.CharClass.E: self.State.STR_LITERAL,
+                self.CharClass.LOW_F: self.State.STR_LITERAL,
+                self.CharClass.LOW_I: self.State.STR_LITERAL,
+                self.CharClass.I: self.State.STR_LITERAL,
+                self.CharClass.LOW_L: self.State.STR_LITERAL,
+                self.CharClass.LOW_N: self.State.STR_LITERAL,
+                self.CharClass.N: self.State.STR_LITERAL,
+                self.CharClass.LOW_R: self.State.STR_LITERAL,
+                self.CharClass.LOW_S: self.State.STR_LITERAL,
+                self.CharClass.LOW_T: self.State.STR_LITERAL,
+                self.CharClass.LOW_U: self.State.STR_LITERAL,
+                self.CharClass.LOW_Y: self.State.STR_LITERAL,
+                self.CharClass.ABCDF: self.State.STR_LITERAL,
+                self.CharClass.ETC: self.State.STR_LITERAL,
             },
             self.State.STR_LITERAL_ESC: {
-                self.CharClass.QUOTE: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.SLASH: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.BACKSLASH: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.LOW_B: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.LOW_F: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.LOW_N: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.LOW_R: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.LOW_T: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.LOW_U: self._transition_with_token_accum(self.State.HEX_ESC),
+                self.CharClass.QUOTE: self.State.STR_LITERAL,
+                self.CharClass.SLASH: self.State.STR_LITERAL,
+                self.CharClass.BACKSLASH: self.State.STR_LITERAL,
+                self.CharClass.LOW_B: self.State.STR_LITERAL,
+                self.CharClass.LOW_F: self.State.STR_LITERAL,
+                self.CharClass.LOW_N: self.State.STR_LITERAL,
+                self.CharClass.LOW_R: self.State.STR_LITERAL,
+                self.CharClass.LOW_T: self.State.STR_LITERAL,
+                self.CharClass.LOW_U: self.State.HEX_ESC,
             },
             self.State.HEX_ESC: {
-                self.CharClass.ZERO: self._transition_with_token_accum(self.State.HEX_DIGIT1),
-                self.CharClass.DIGIT: self._transition_with_token_accum(self.State.HEX_DIGIT1),
-                self.CharClass.LOW_A: self._transition_with_token_accum(self.State.HEX_DIGIT1),
-                self.CharClass.LOW_B: self._transition_with_token_accum(self.State.HEX_DIGIT1),
-                self.CharClass.LOW_C: self._transition_with_token_accum(self.State.HEX_DIGIT1),
-                self.CharClass.LOW_D: self._transition_with_token_accum(self.State.HEX_DIGIT1),
-                self.CharClass.LOW_E: self._transition_with_token_accum(self.State.HEX_DIGIT1),
-                self.CharClass.LOW_F: self._transition_with_token_accum(self.State.HEX_DIGIT1),
-                self.CharClass.ABCDF: self._transition_with_token_accum(self.State.HEX_DIGIT1),
-                self.CharClass.E: self._transition_with_token_accum(self.State.HEX_DIGIT1),
+                self.CharClass.ZERO: self.State.HEX_DIGIT1,
+                self.CharClass.DIGIT: self.State.HEX_DIGIT1,
+                self.CharClass.LOW_A: self.State.HEX_DIGIT1,
+                self.CharClass.LOW_B: self.State.HEX_DIGIT1,
+                self.CharClass.LOW_C: self.State.HEX_DIGIT1,
+                self.CharClass.LOW_D: self.State.HEX_DIGIT1,
+                self.CharClass.LOW_E: self.State.HEX_DIGIT1,
+                self.CharClass.LOW_F: self.State.HEX_DIGIT1,
+                self.CharClass.ABCDF: self.State.HEX_DIGIT1,
+                self.CharClass.E: self.State.HEX_DIGIT1,
             },
             self.State.HEX_DIGIT1: {
-                self.CharClass.ZERO: self._transition_with_token_accum(self.State.HEX_DIGIT2),
-                self.CharClass.DIGIT: self._transition_with_token_accum(self.State.HEX_DIGIT2),
-                self.CharClass.LOW_A: self._transition_with_token_accum(self.State.HEX_DIGIT2),
-                self.CharClass.LOW_B: self._transition_with_token_accum(self.State.HEX_DIGIT2),
-                self.CharClass.LOW_C: self._transition_with_token_accum(self.State.HEX_DIGIT2),
-                self.CharClass.LOW_D: self._transition_with_token_accum(self.State.HEX_DIGIT2),
-                self.CharClass.LOW_E: self._transition_with_token_accum(self.State.HEX_DIGIT2),
-                self.CharClass.LOW_F: self._transition_with_token_accum(self.State.HEX_DIGIT2),
-                self.CharClass.ABCDF: self._transition_with_token_accum(self.State.HEX_DIGIT2),
-                self.CharClass.E: self._transition_with_token_accum(self.State.HEX_DIGIT2),
+                self.CharClass.ZERO: self.State.HEX_DIGIT2,
+                self.CharClass.DIGIT: self.State.HEX_DIGIT2,
+                self.CharClass.LOW_A: self.State.HEX_DIGIT2,
+                self.CharClass.LOW_B: self.State.HEX_DIGIT2,
+                self.CharClass.LOW_C: self.State.HEX_DIGIT2,
+                self.CharClass.LOW_D: self.State.HEX_DIGIT2,
+                self.CharClass.LOW_E: self.State.HEX_DIGIT2,
+                self.CharClass.LOW_F: self.State.HEX_DIGIT2,
+                self.CharClass.ABCDF: self.State.HEX_DIGIT2,
+                self.CharClass.E: self.State.HEX_DIGIT2,
             },
             self.State.HEX_DIGIT2: {
-                self.CharClass.ZERO: self._transition_with_token_accum(self.State.HEX_DIGIT3),
-                self.CharClass.DIGIT: self._transition_with_token_accum(self.State.HEX_DIGIT3),
-                self.CharClass.LOW_A: self._transition_with_token_accum(self.State.HEX_DIGIT3),
-                self.CharClass.LOW_B: self._transition_with_token_accum(self.State.HEX_DIGIT3),
-                self.CharClass.LOW_C: self._transition_with_token_accum(self.State.HEX_DIGIT3),
-                self.CharClass.LOW_D: self._transition_with_token_accum(self.State.HEX_DIGIT3),
-                self.CharClass.LOW_E: self._transition_with_token_accum(self.State.HEX_DIGIT3),
-                self.CharClass.LOW_F: self._transition_with_token_accum(self.State.HEX_DIGIT3),
-                self.CharClass.ABCDF: self._transition_with_token_accum(self.State.HEX_DIGIT3),
-                self.CharClass.E: self._transition_with_token_accum(self.State.HEX_DIGIT3),
+                self.CharClass.ZERO: self.State.HEX_DIGIT3,
+                self.CharClass.DIGIT: self.State.HEX_DIGIT3,
+                self.CharClass.LOW_A: self.State.HEX_DIGIT3,
+                self.CharClass.LOW_B: self.State.HEX_DIGIT3,
+                self.CharClass.LOW_C: self.State.HEX_DIGIT3,
+                self.CharClass.LOW_D: self.State.HEX_DIGIT3,
+                self.CharClass.LOW_E: self.State.HEX_DIGIT3,
+                self.CharClass.LOW_F: self.State.HEX_DIGIT3,
+                self.CharClass.ABCDF: self.State.HEX_DIGIT3,
+                self.CharClass.E: self.State.HEX_DIGIT3,
             },
             self.State.HEX_DIGIT3: {
-                self.CharClass.ZERO: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.DIGIT: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.LOW_A: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.LOW_B: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.LOW_C: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.LOW_D: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.LOW_E: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.LOW_F: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.ABCDF: self._transition_with_token_accum(self.State.STR_LITERAL),
-                self.CharClass.E: self._transition_with_token_accum(self.State.STR_LITERAL),
+                self.CharClass.ZERO: self.State.STR_LITERAL,
+                self.CharClass.DIGIT: self.State.STR_LITERAL,
+                self.CharClass.LOW_A: self.State.STR_LITERAL,
+                self.CharClass.LOW_B: self.State.STR_LITERAL,
+                self.CharClass.LOW_C: self.State.STR_LITERAL,
+                self.CharClass.LOW_D: self.State.STR_LITERAL,
+                self.CharClass.LOW_E: self.State.STR_LITERAL,
+                self.CharClass.LOW_F: self.State.STR_LITERAL,
+                self.CharClass.ABCDF: self.State.STR_LITERAL,
+                self.CharClass.E: self.State.STR_LITERAL,
             },
             self.State.TRUE_LITERAL_T: {self.CharClass.LOW_R: self.State.TRUE_LITERAL_R},
             self.State.TRUE_LITERAL_R: {self.CharClass.LOW_U: self.State.TRUE_LITERAL_U},
             self.State.TRUE_LITERAL_U: {
-                self.CharClass.LOW_E: self._transition_with_event(self.State.OK, "value_end", event_param=True)
+                self.CharClass.LOW_E: self._transition_with_value(self.State.OK, True)
             },
             self.State.FALSE_LITERAL_F: {self.CharClass.LOW_A: self.State.FALSE_LITERAL_A},
             self.State.FALSE_LITERAL_A: {self.CharClass.LOW_L: self.State.FALSE_LITERAL_L},
             self.State.FALSE_LITERAL_L: {self.CharClass.LOW_S: self.State.FALSE_LITERAL_S},
             self.State.FALSE_LITERAL_S: {
-                self.CharClass.LOW_E: self._transition_with_event(self.State.OK, "value_end", event_param=False)
+                self.CharClass.LOW_E: self._transition_with_value(self.State.OK, False)
             },
             self.State.NULL_LITERAL_N: {self.CharClass.LOW_U: self.State.NULL_LITERAL_U},
             self.State.NULL_LITERAL_U: {self.CharClass.LOW_L: self.State.NULL_LITERAL_L},
             self.State.NULL_LITERAL_L: {
-                self.CharClass.LOW_L: self._transition_with_event(self.State.OK, "value_end", event_param=None)
+                self.CharClass.LOW_L: self._transition_with_value(self.State.OK, None)
             },
             self.State.NAN_LITERAL_N: {self.CharClass.LOW_A: self.State.NAN_LITERAL_A},
             self.State.NAN_LITERAL_A: {
-                self.CharClass.N: self._transition_with_event(self.State.OK, "value_end", event_param=float('nan'))
+                self.CharClass.N: self._constant_transition(self.State.OK, 'NaN')
             },
             self.State.POSITIVE_INFINITY_I:  {self.CharClass.LOW_N: self.State.POSITIVE_INFINITY_N},
             self.State.POSITIVE_INFINITY_N:  {self.CharClass.LOW_F: self.State.POSITIVE_INFINITY_F},
@@ -392,7 +546,7 @@ class Parser:
             self.State.POSITIVE_INFINITY_N2: {self.CharClass.LOW_I: self.State.POSITIVE_INFINITY_I3},
             self.State.POSITIVE_INFINITY_I3: {self.CharClass.LOW_T: self.State.POSITIVE_INFINITY_T},
             self.State.POSITIVE_INFINITY_T:  {
-                self.CharClass.LOW_Y: self._transition_with_event(self.State.OK, "value_end", event_param=float('inf'))
+                self.CharClass.LOW_Y: self._constant_transition(self.State.OK, 'Infinity')
             },
             self.State.NEGATIVE_INFINITY_I:  {self.CharClass.LOW_N: self.State.NEGATIVE_INFINITY_N},
             self.State.NEGATIVE_INFINITY_N:  {self.CharClass.LOW_F: self.State.NEGATIVE_INFINITY_F},
@@ -401,43 +555,301 @@ class Parser:
             self.State.NEGATIVE_INFINITY_N2: {self.CharClass.LOW_I: self.State.NEGATIVE_INFINITY_I3},
             self.State.NEGATIVE_INFINITY_I3: {self.CharClass.LOW_T: self.State.NEGATIVE_INFINITY_T},
             self.State.NEGATIVE_INFINITY_T:  {
-                self.CharClass.LOW_Y: self._transition_with_event(self.State.OK, "value_end", event_param=float('-inf'))
+                self.CharClass.LOW_Y: self._constant_transition(self.State.OK, '-Infinity')
             },
+            self.State.SKIP: skip_transitions,
+            self.State.SKIP_STR: skip_transitions,
+            self.State.SKIP_STR_ESC: skip_transitions,
             self.State.OK: {
                 self.CharClass.SPACE: self.State.OK,
-                self.CharClass.WHITESPACE: self.State.OK,
+                self.CharClass.WHITESPACE: self._whitespace_run_transition(self.State.OK),
                 self.CharClass.RIGHT_CURVED_BRACKET: self._right_curved_bracket_transition,
                 self.CharClass.RIGHT_SQUARE_BRACKET: self._right_square_bracket_transition,
                 self.CharClass.COMMA: self._comma_transition,
+                **next_document_transitions
             }
         }
 
+        self.transitions = self._flatten_transition_table()
+
+    def _number_hook(self, hook, default):
+        """
+        Make a function converting numeric literal tokens with hook, passing it str tokens also in bytes mode.
+        """
+
+        if hook is None:
+            return default
+        if self.bytes_mode:
+            return lambda token: hook(token.decode('ascii'))
+        return hook
+
+    def _flatten_transition_table(self):
+        """
+        Flatten transition table into a list indexed by state * class_count + char class.
+
+        Entries are ints for plain transitions to another state, callables for transitions with side effects and
+        None for chars unexpected in a state.
+        """
+
+        transitions = [None] * (max(self.State) + 1) * self.class_count
+        for state, state_transitions in self.transition_table.items():
+            for char_class, next_state in state_transitions.items():
+                if isinstance(next_state, self.State):
+                    next_state = int(next_state)
+                transitions[state * self.class_count + char_class] = next_state
+
+        return transitions
+
+    @property
+    def handler(self):
+        return self._handler
+
+    @handler.setter
+    def handler(self, handler):
+        # Transitions call bound handler methods directly
+        self._handler = handler
+        self._on_object_start = handler.on_object_start
+        self._on_object_end = handler.on_object_end
+        self._on_array_start = handler.on_array_start
+        self._on_array_end = handler.on_array_end
+        self._on_key = handler.on_key
+        self._on_value = handler.on_value
+
     def parse(self, gen):
+        """
+        Parse data chunks from gen, yielding events as (event name, event param) tuples.
+
+        Replaces parser's handler.
+        """
+
+        buffer = _EventBuffer()
+        self.handler = buffer
+
         for data in gen:
-            self._load(data)
-            for event in self._parse_chunk():
-                yield event
+            yield from self._flush_events(buffer.events, self.feed, data)
+
+        yield from self._flush_events(buffer.events, self.close)
+
+    def parse_file(self, path, chunk_size=65536):
+        """
+        Parse file mapped into memory, yielding events as parse() does.
+
+        :param path: file path
+        :param chunk_size: size of memoryview chunks passed to the parser
+        """
+
+        yield from self.parse(self.iter_file_chunks(path, chunk_size))
+
+        # Last chunk would keep the file mapped as long as the parser lives
+        self.data = self.empty_token
+
+    @staticmethod
+    def iter_file_chunks(path, chunk_size=65536):
+        """
+        Map file into memory, yielding memoryview slices of it without copying.
+
+        The file stays mapped until the last slice is released.
+
+        :param path: file path
+        :param chunk_size: size of slices
+        """
+
+        with open(path, 'rb') as fp:
+            if os.fstat(fp.fileno()).st_size == 0:
+                return
+            mapped = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
 
-        if self.state != self.State.OK:
-            for event in self._process_char('<end of data>', self.CharClass.END_OF_DATA):
-                yield event
-        elif not self._pop(self.Mode.DONE):
-            self._raise_parse_error('<end of data>')
+        view = memoryview(mapped)
+        for start in range(0, len(view), chunk_size):
+            yield view[start:start + chunk_size]
+
+    def feed(self, data):
+        """
+        Parse data chunk, pushing events to the handler.
+
+        :param data: str or UTF-8 encoded bytes-like object
+        """
+
+        self._load(data)
+        if self.bytes_mode:
+            self._parse_bytes_chunk()
+        else:
+            self._parse_chunk()
+
+    def close(self):
+        """
+        Signal end of data, pushing remaining events to the handler.
+        """
+
+        # Raises on an incomplete multibyte char left from the last chunk
+        self.utf8_decoder.decode(b'', True)
+
+        if self.state == self.State.OK:
+            if not self._pop(self.Mode.DONE):
+                self._raise_parse_error('<end of data>')
+        elif self.multi_document and self.state == self.State.ELEM_START and self.stack == [self.Mode.DONE]:
+            # No value follows the last one
+            self.stack.pop()
+        else:
+            self._process_char('<end of data>', self.CharClass.END_OF_DATA)
+
+    def skip(self):
+        """
+        Skip the rest of the value being parsed, to be called from a handler callback.
+
+        Called from on_key() it skips the value of the key, and no events are pushed for it. Called from
+        on_object_start() or on_array_start() it skips contents of the container, and only its end event is
+        pushed. Skipped data is only scanned for brackets and string boundaries, and is not validated.
+        """
+
+        if self.state == self.State.COLON:
+            self.skip_value = True
+        elif self.state in [self.State.OBJECT, self.State.ARRAY]:
+            self.skip_value = False
+        else:
+            raise RuntimeError("skip() can only be called from on_key(), on_object_start() or on_array_start()")
+
+        # Data following skipped one is parsed as following an object value or an array element
+        if self.stack[-1] == self.Mode.KEY:
+            self.stack[-1] = self.Mode.OBJECT
+        self.skip_depth = 0
+        self.state = self.State.SKIP
+
+    @property
+    def value_end(self):
+        """
+        Global index where the value just pushed ends, to be read from a handler callback.
+
+        Numeric literals inside containers are pushed once a char following them is parsed.
+        """
+        numeric_states = [self.State.INT_LITERAL, self.State.INT_ZERO_LITERAL, self.State.FLOAT_LITERAL,
+                          self.State.EXP_LITERAL]
+        if self.state in numeric_states and self.stack:
+            return self.index - 1
+        return self.index
+
+    def checkpoint(self):
+        """
+        Serialize parsing progress, to be called between feed() calls.
+
+        The blob keeps the part of the current token fed so far, so parsing can be resumed by a parser restored
+        from it and fed with data following the first offset bytes or chars of the input. Handler state is not
+        included, so the handler has to be able to resume on its own.
+
+        :return: bytes blob to pass to restore()
+        """
+
+        if self.local_index != len(self.data):
+            raise RuntimeError("checkpoint() can only be called between feed() calls")
+
+        if self.token_start is None:
+            token = self.empty_token
+        else:
+            token = self.empty_token.join(self.token_parts + [self.data[self.token_start:]])
+            if token.__class__ is memoryview:
+                token = token.tobytes()
+        if not self.bytes_mode:
+            token = token.encode('utf-8', 'surrogatepass')
+
+        header = {
+            "version": self.checkpoint_version,
+            "bytes_mode": self.bytes_mode,
+            "multi_document": self.multi_document,
+            "materialize": self.materialize,
+            "state": int(self.state),
+            "stack": [mode.value for mode in self.stack],
+            "token": self.token_start is not None,
+            "index": self.index,
+            "offset": self.offset,
+            "skip_depth": self.skip_depth,
+            "skip_value": self.skip_value,
+            "utf8_pending": self.utf8_decoder.getstate()[0].hex(),
+        }
+
+        return json.dumps(header, separators=(',', ':')).encode('utf-8') + b'\n' + token
+
+    def restore(self, blob):
+        """
+        Restore parsing progress serialized by checkpoint().
+
+        :param blob: bytes blob returned by checkpoint() of a parser in the same bytes mode
+        :return: count of bytes or chars of the input already fed, further data has to be fed starting from it
+        """
+
+        header, _, token = bytes(blob).partition(b'\n')
+        header = json.loads(header.decode('utf-8'))
+        if header.get("version") != self.checkpoint_version:
+            raise ValueError("Unsupported checkpoint version {}".format(header.get("version")))
+        if header["bytes_mode"] != self.bytes_mode:
+            raise ValueError("Checkpoint of a parser with bytes_mode={} cannot be restored with bytes_mode={}".format(
+                header["bytes_mode"],
+                self.bytes_mode
+            ))
+
+        self.multi_document = header["multi_document"]
+        self.materialize = header["materialize"]
+        self.state = self.State(header["state"])
+        self.stack = [self.Mode(mode) for mode in header["stack"]]
+        self.index = header["index"]
+        self.offset = header["offset"]
+        self.skip_depth = header["skip_depth"]
+        self.skip_value = header["skip_value"]
+        self.utf8_decoder.setstate((bytes.fromhex(header["utf8_pending"]), 0))
+
+        # Token fed so far is carried over to next chunk as if it was a tail of previous one
+        self.data = self.empty_token
+        self.local_index = 0
+        if header["token"]:
+            self.token_parts = [token if self.bytes_mode else token.decode('utf-8', 'surrogatepass')]
+            self.token_start = 0
+        else:
+            self.token_parts = []
+            self.token_start = None
+
+        return self.offset
+
+    @staticmethod
+    def _flush_events(events, fun, *args):
+        """
+        Call fun and yield events it has added to the buffer, also those preceding a parse error.
+        """
+
+        try:
+            fun(*args)
+        except ParseError:
+            yield from events
+            raise
+
+        yield from events
+        events.clear()
 
     def _load(self, data):
         """
-        Load data chunk, checking for utf-8 BOM and decoding bytes.
+        Load data chunk, checking for UTF-8 BOM and decoding bytes unless in bytes mode.
         """
 
+        if self.token_start is not None:
+            tail = self.data[self.token_start:]
+            # Buffer behind a memoryview may be reused by the caller for next chunk
+            self.token_parts.append(tail.tobytes() if tail.__class__ is memoryview else tail)
+            self.token_start = 0
+
         self.local_index = 0
+        self.offset += len(data)
+
+        if self.bytes_mode:
+            if isinstance(data, str):
+                data = data.encode('utf-8')
+            bom = codecs.BOM_UTF8
+        else:
+            if not isinstance(data, str):
+                data = self.utf8_decoder.decode(data)
+            bom = '\ufeff'
 
-        if self.index == 0 and data.startswith('\ufeff'):
+        if self.index == 0 and data[:len(bom)] == bom:
             self._raise_parse_error("<unexpected UTF-8 BOM>")
 
-        if type(data) is bytes:
-            self.data = data.decode("utf-8")
-        else:
-            self.data = data
+        self.data = data
 
     def _pop(self, mode):
         """
@@ -449,43 +861,129 @@ class Parser:
         self.stack.pop()
         return True
 
-    def _transition_with_event(self, state, event_name, event_param=None, use_token=False):
+    def _transition_with_value(self, state, value):
         """
-        Transition to state while yielding an event.
+        Transition to state while pushing a value.
         """
 
-        if use_token:
-            event_param = self.token
+        def fun(slf, _):
+            slf.state = state
+            slf._on_value(value)
+
+        return partial(fun, self)
+
+    def _constant_transition(self, state, literal):
+        """
+        Transition to state while pushing the value of a constant literal, see _constant().
+        """
 
         def fun(slf, _):
             slf.state = state
-            yield event_name, event_param
+            slf._on_value(slf._constant(literal))
+
+        return partial(fun, self)
+
+    def _named_literal_transition(self, state, literal, value=None):
+        """
+        Transition to state of a named literal (true, null, NaN, ...), or consume the whole literal at once
+        pushing its value if the chunk holds it completely.
+
+        Values of constant literals are found by _constant() when they are pushed, rather than passed as value.
+        """
+
+        is_constant = literal in self.constants
+        name = literal
+        if self.bytes_mode:
+            literal = literal.encode()
+
+        def fun(slf, _):
+            start = slf.local_index - 1
+            if slf.data[start:start + len(literal)] == literal:
+                slf._skip_chars(len(literal) - 1)
+                slf.state = slf.State.OK
+                slf._on_value(slf._constant(name) if is_constant else value)
+            else:
+                slf.state = state
 
         return partial(fun, self)
 
-    def _transition_with_token_accum(self, state):
+    def _numeric_literal_transition(self, state):
         """
-        Transition to state while accumulating passed char in token.
+        Transition to numeric literal state starting a token with passed char, or consume the whole
+        literal at once pushing its value if the chunk holds it completely.
         """
 
+        negative_infinity = b'-Infinity' if self.bytes_mode else '-Infinity'
+        small_ints = self.small_ints
+        parse_int = self.parse_int
+        parse_float = self.parse_float
+
         def fun(slf, ch):
-            slf.token += ch
+            start = slf.local_index - 1
+            match = slf.numeric_literal.match(slf.data, start)
+            if match is not None:
+                literal = match.group()
+                slf._skip_chars(len(literal) - 1)
+                slf.state = slf.State.OK
+                if not slf.materialize:
+                    slf._on_value(None)
+                elif match.lastindex is None:
+                    value = small_ints.get(literal)
+                    slf._on_value(value if value is not None else parse_int(literal))
+                else:
+                    slf._on_value(parse_float(literal))
+            elif ch == '-' and slf.data[start:start + len(negative_infinity)] == negative_infinity:
+                slf._skip_chars(len(negative_infinity) - 1)
+                slf.state = slf.State.OK
+                slf._on_value(slf._constant('-Infinity'))
+            else:
+                slf.token_start = start
+                slf.state = state
+
+        return partial(fun, self)
+
+    def _constant(self, literal):
+        """
+        Value of "-Infinity", "Infinity" or "NaN" literal, converted by parse_constant hook if it is set.
+        """
+
+        if self.parse_constant is None:
+            return self.constants[literal]
+        if not self.materialize:
+            return None
+        return self.parse_constant(literal)
+
+    def _whitespace_run_transition(self, state):
+        """
+        Transition to state while consuming the whole run of whitespace following passed char.
+        """
+
+        def fun(slf, _):
+            run_end = slf.whitespace_run.match(slf.data, slf.local_index).end()
+            slf._skip_chars(run_end - slf.local_index)
             slf.state = state
-            yield from []
 
         return partial(fun, self)
 
+    def _negative_infinity_transition(self, _):
+        # "-" starting a numeric literal token is not a part of -Infinity event
+        self._drop_token()
+        self.state = self.State.NEGATIVE_INFINITY_I
+
     def _left_curved_bracket_transition(self, _):
         self.stack.append(self.Mode.KEY)
         self.state = self.State.OBJECT
 
-        yield "object_start", None
+        self._on_object_start()
 
     def _left_square_bracket_transition(self, _):
+        if self.numeric_arrays is not None and self.materialize and self._take_numeric_array():
+            return
+
         self.stack.append(self.Mode.ARRAY)
         self.state = self.State.ARRAY
 
-        yield "array_start", None
+        self._on_array_start()
 
     def _empty_right_curved_bracket_transition(self, ch):
         if not self._pop(self.Mode.KEY):
@@ -493,42 +991,38 @@ class Parser:
 
         self.state = self.State.OK
 
-        yield "object_end", None
+        self._on_object_end()
 
     def _right_curved_bracket_transition(self, ch):
         if not self._pop(self.Mode.OBJECT):
             self._raise_parse_error(ch)
 
-        for evt_name, evt_param in self._yield_literal_event():
-            yield evt_name, evt_param
+        self._emit_literal_event(self.local_index - 1)
 
         self.state = self.State.OK
 
-        yield "object_end", None
+        self._on_object_end()
 
     def _right_square_bracket_transition(self, ch):
         if not self._pop(self.Mode.ARRAY):
             self._raise_parse_error(ch)
 
-        for evt_name, evt_param in self._yield_literal_event():
-            yield evt_name, evt_param
+        self._emit_literal_event(self.local_index - 1)
 
         self.state = self.State.OK
 
-        yield "array_end", None
+        self._on_array_end()
 
     def _comma_transition(self, ch):
         if self.stack[-1] == self.Mode.OBJECT:
-            for evt_name, evt_param in self._yield_literal_event():
-                yield evt_name, evt_param
+            self._emit_literal_event(self.local_index - 1)
 
             self._pop(self.Mode.OBJECT)
             self.stack.append(self.Mode.KEY)
             self.state = self.State.ELEM_START
 
         elif self.stack[-1] == self.Mode.ARRAY:
-            for evt_name, evt_param in self._yield_literal_event():
-                yield evt_name, evt_param
+            self._emit_literal_event(self.local_index - 1)
 
             self.state = self.State.ELEM_START
 
@@ -542,69 +1036,335 @@ class Parser:
         self.stack.append(self.Mode.OBJECT)
         self.state = self.State.ELEM_START
 
-        yield from []
-
     def _quote_transition(self, ch):
         stack_top = self.stack[-1]
         if stack_top == self.Mode.KEY:
-            token = self._decode_string_literal(ch)
-            yield "object_key_end", token
-            self.token = ''
-            self.state = self.state.COLON
+            key = self._take_key(ch)
+            # State is set before pushing the key, as the handler may call skip()
+            self.state = self.State.COLON
+            self._on_key(key)
         elif stack_top in [self.Mode.OBJECT, self.Mode.ARRAY, self.Mode.DONE]:
-            token = self._decode_string_literal(ch)
-            yield "value_end", token
-            self.token = ''
-            self.state = self.state.OK
+            self._on_value(self._take_string_value(ch))
+            self.state = self.State.OK
         else:
             self._raise_parse_error(ch)
-            yield from []
+
+    def _skip_transition(self, _):
+        """
+        Transition consuming skipped data up to the end of the skipped value, or up to the end of chunk.
+        """
+        data = self.data
+        data_len = len(data)
+        pos = self.local_index - 1
+        state = self.state
+        depth = self.skip_depth
+
+        while pos < data_len:
+            if state == self.State.SKIP_STR_ESC:
+                pos += 1
+                state = self.State.SKIP_STR
+                continue
+
+            if state == self.State.SKIP_STR:
+                match = self.skip_str_stop_chars.search(data, pos)
+                if match is None:
+                    pos = data_len
+                    break
+                state = self.State.SKIP if match.lastindex == 1 else self.State.SKIP_STR_ESC
+                pos = match.end()
+                continue
+
+            match = (self.skip_value_run if depth == 0 and self.skip_value else self.skip_run).match(data, pos)
+            pos = match.end()
+            kind = match.lastindex
+            if kind is None:
+                break
+            elif kind == 1:
+                state = self.State.SKIP_STR
+            elif kind == 2:
+                depth += 1
+            elif depth > 0:
+                depth -= 1
+            else:
+                # Closing bracket or comma following skipped data is parsed as usual
+                pos -= 1
+                state = self.State.OK
+                break
+
+        self.state = state
+        self.skip_depth = depth
+        self._skip_chars(pos - self.local_index)
+
+    def _next_document_transition(self, ch):
+        """
+        Transition to the next top-level value in multi-document mode, parsing passed char again as its start.
+        """
+        if not self.multi_document or self.stack[-1] != self.Mode.DONE:
+            self._raise_parse_error(ch)
+
+        self.state = self.State.ELEM_START
+        self._skip_chars(-1)
+
+    def _record_separator_transition(self, ch):
+        """
+        Transition over RS char preceding a top-level value in multi-document mode.
+        """
+        if not self.multi_document or ch != '\x1e' or self.stack != [self.Mode.DONE]:
+            self._raise_parse_error(ch)
+
+        self.state = self.State.ELEM_START
 
     def _end_of_data_transition(self, ch):
         """
-        "End of data" transition yielding a value_end for accumulated numeric literals.
+        "End of data" transition pushing accumulated numeric literal.
         """
         if not self._pop(self.Mode.DONE):
             self._raise_parse_error(ch)
 
-        for evt_name, evt_param in self._yield_literal_event():
-            yield evt_name, evt_param
+        self._emit_literal_event(self.local_index)
 
     def _numeric_literal_whitespace_transition(self, _):
         """
-        Transition from numeric literal to whitespace, yielding a value_end event.
+        Transition from numeric literal to whitespace, pushing its value.
         """
-        for evt_name, evt_param in self._yield_literal_event():
-            yield evt_name, evt_param
+        self._emit_literal_event(self.local_index - 1)
 
         self.state = self.State.OK
 
-    def _yield_literal_event(self):
+    def _emit_literal_event(self, token_end):
         """
-        Yield a value_end event if current state is "parsing numeric literal".
+        Push a value if current state is "parsing numeric literal".
+
+        :param token_end: position in data chunk where numeric literal token ends
         """
         if self.state in [self.State.INT_LITERAL, self.State.INT_ZERO_LITERAL]:
-            yield "value_end", int(self.token)
-            self.token = ''
-
+            convert = self.parse_int
         elif self.state in [self.State.FLOAT_LITERAL, self.State.EXP_LITERAL]:
-            yield "value_end", float(self.token)
-            self.token = ''
+            convert = self.parse_float
+        else:
+            return
+
+        if self.materialize:
+            self._on_value(convert(self._take_token(token_end)))
+        else:
+            self._drop_token()
+            self._on_value(None)
+
+    def _take_string_literal(self, ch):
+        """
+        Take and decode string literal token ended by quote, unless not materializing values.
+        """
+        if not self.materialize:
+            self._drop_token()
+            return None
+
+        return self._decode_string_literal(self._take_token(self.local_index - 1), ch)
+
+    def _take_key(self, ch):
+        """
+        Take object key token ended by quote, decoding it only if it is not in the key cache.
+
+        Keys of same-shaped objects are decoded once and shared by all of them.
+        """
+        if not self.materialize or self.key_cache_size == 0:
+            return self._take_string_literal(ch)
+
+        token = self._take_token(self.local_index - 1)
+        key_cache = self.key_cache
+        key = key_cache.get(token)
+        if key is None:
+            key = sys.intern(self._decode_string_literal(token, ch))
+            self._put_cached(key_cache, self.key_cache_size, token, key)
+        else:
+            key_cache.move_to_end(token)
+
+        return key
+
+    def _take_string_value(self, ch):
+        """
+        Take string value token ended by quote, decoding it only if it is not in the value cache.
 
+        Only tokens of at most value_cache_max_length are looked up.
+        """
+        if not self.materialize or self.value_cache_size == 0:
+            return self._take_string_literal(ch)
+
+        token = self._take_token(self.local_index - 1)
+        if len(token) > self.value_cache_max_length:
+            return self._decode_string_literal(token, ch)
+
+        value_cache = self.value_cache
+        value = value_cache.get(token)
+        if value is None:
+            self.value_cache_misses += 1
+            value = self._decode_string_literal(token, ch)
+            self._put_cached(value_cache, self.value_cache_size, token, value)
         else:
-            yield from []
+            self.value_cache_hits += 1
+            value_cache.move_to_end(token)
+
+        return value
+
+    @staticmethod
+    def _put_cached(cache, cache_size, token, value):
+        """
+        Put decoded value into an LRU cache, evicting the least recently used one if it is full.
+        """
+        cache[token] = value
+        if len(cache) > cache_size:
+            cache.popitem(last=False)
+
+    def _take_numeric_array(self):
+        """
+        Push an array of numbers only as a single typed array, converting all of them in a batch, if the chunk
+        holds the array completely.
+
+        :return: whether the array has been pushed
+        """
+        match = self.numeric_array.match(self.data, self.local_index)
+        if match is None:
+            return False
+
+        literal = match.group()
+        separator = b',' if self.bytes_mode else ','
+        is_float = self.float_chars.search(literal) is not None
+        values = array_from_tokens(literal[:-1].split(separator), is_float, self.numeric_arrays)
+        if values is None:
+            return False
+
+        self._skip_chars(len(literal))
+        self.state = self.State.OK
+        self._on_value(values)
+        return True
+
+    def _take_token(self, token_end):
+        """
+        Take current token in a single slice, joining it with parts carried over from previous chunks.
+
+        :param token_end: position in data chunk where token ends
+        """
+        token = self.data[self.token_start:token_end]
+        if self.token_parts:
+            self.token_parts.append(token)
+            token = self.empty_token.join(self.token_parts)
+            self.token_parts.clear()
+        elif token.__class__ is memoryview:
+            token = token.tobytes()
+        self.token_start = None
+
+        return token
+
+    def _drop_token(self):
+        """
+        Forget current token without taking it.
+        """
+        self.token_start = None
+        self.token_parts.clear()
 
     def _parse_chunk(self):
         """
         Parse currently loaded data chunk.
         """
-        for ch in self.data:
-            self.local_index += 1
-            self.index += 1
+        data = self.data
+        data_len = len(data)
+        ascii_char_classes = self.ascii_char_classes
+        transitions = self.transitions
+        class_count = self.class_count
+        etc = int(self.CharClass.ETC)
+        str_literal = int(self.State.STR_LITERAL)
+        chunk_index = self.index - self.local_index
+        pos = self.local_index
+        state = self.state
+
+        while pos < data_len:
+            if state == str_literal:
+                pos = self._scan_str_literal(pos)
+                if pos == data_len:
+                    break
+
+            ch = data[pos]
+            pos += 1
+            code = ord(ch)
+            next_state = transitions[state * class_count + (ascii_char_classes[code] if code < 128 else etc)]
+
+            if next_state.__class__ is int:
+                state = next_state
+                continue
+
+            # Transitions with side effects work on parser attributes and may consume more than a single char
+            self.state = state
+            self.local_index = pos
+            self.index = chunk_index + pos
+            if next_state is None:
+                self._raise_parse_error(ch)
+            next_state(ch)
+            state = self.state
+            pos = self.local_index
+
+        self.state = state
+        self.local_index = pos
+        self.index = chunk_index + pos
+
+    def _parse_bytes_chunk(self):
+        """
+        Parse currently loaded data chunk in bytes mode, same as _parse_chunk() but taking char classes by byte.
+        """
+        data = self.data
+        data_len = len(data)
+        byte_char_classes = self.byte_char_classes
+        transitions = self.transitions
+        class_count = self.class_count
+        str_literal = int(self.State.STR_LITERAL)
+        chunk_index = self.index - self.local_index
+        pos = self.local_index
+        state = self.state
+
+        while pos < data_len:
+            if state == str_literal:
+                pos = self._scan_str_literal(pos)
+                if pos == data_len:
+                    break
+
+            code = data[pos]
+            pos += 1
+            next_state = transitions[state * class_count + byte_char_classes[code]]
+
+            if next_state.__class__ is int:
+                state = next_state
+                continue
+
+            self.state = state
+            self.local_index = pos
+            self.index = chunk_index + pos
+            if next_state is None:
+                self._raise_parse_error(chr(code))
+            next_state(chr(code))
+            state = self.state
+            pos = self.local_index
+
+        self.state = state
+        self.local_index = pos
+        self.index = chunk_index + pos
+
+    def _skip_chars(self, count):
+        """
+        Advance over chars consumed by a transition in bulk.
+        """
+        self.local_index += count
+        self.index += count
+
+    def _scan_str_literal(self, pos):
+        """
+        Skip an unescaped run of a string literal, starting its token if needed.
 
-            char_class = self.get_char_class(ch)
-            for evt_name, evt_param in self._process_char(ch, char_class):
-                yield evt_name, evt_param
+        :param pos: position in data chunk to start scanning from
+        :return: position of the first char which ends the run
+        """
+        if self.token_start is None:
+            self.token_start = pos
+
+        match = self.str_literal_stop_chars.search(self.data, pos)
+        return match.start() if match is not None else len(self.data)
 
     def _process_char(self, ch, char_class):
         """
@@ -613,26 +1373,28 @@ class Parser:
         :param ch: char
         :param char_class: char class
         """
-        if char_class == self.CharClass.CONTROL:
-            self._raise_parse_error(ch)
-
-        next_state = self.transition_table[self.state].get(char_class, None)
+        next_state = self.transitions[self.state * self.class_count + char_class]
         if next_state is None:
             self._raise_parse_error(ch)
-        elif not callable(next_state):
+        elif next_state.__class__ is int:
             self.state = next_state
         else:
-            for evt_name, evt_param in next_state(ch):
-                yield evt_name, evt_param
+            next_state(ch)
 
-    def _decode_string_literal(self, ch):
+    def _decode_string_literal(self, token, ch):
         """
         Decode string literal with json.loads.
         """
 
-        token = ''
+        if self.bytes_mode:
+            token = token.decode('utf-8')
+
+        # Without escapes the token is already decoded, as quotes and control chars cannot appear in it
+        if '\\' not in token:
+            return token
+
         try:
-            token = json.loads('"' + self.token + '"')
+            token = json.loads('"' + token + '"')
         except json.decoder.JSONDecodeError:
             self._raise_parse_error(ch)
 
@@ -647,7 +1409,34 @@ class Parser:
         raise ParseError("Parse error: unexpected char '{}' ({}) in state {} (local index {}, global index {})".format(
             ch,
             ord(ch) if len(ch) == 1 else "",
-            self.state.name,
+            self.State(self.state).name,
             self.local_index,
             self.index
           ))
+
+
+class _EventBuffer(Handler):
+    """
+    Handler collecting events as (event name, event param) tuples for Parser.parse().
+    """
+
+    def __init__(self):
+        self.events = []
+
+    def on_object_start(self):
+        self.events.append(("object_start", None))
+
+    def on_object_end(self):
+        self.events.append(("object_end", None))
+
+    def on_array_start(self):
+        self.events.append(("array_start", None))
+
+    def on_array_end(self):
+        self.events.append(("array_end", None))
+
+    def on_key(self, key):
+        self.events.append(("object_key_end", key))
+
+    def on_value(self, value):
+        self.events.append(("value_end", value))
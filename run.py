@@ -9,19 +9,12 @@ class EffectiveDecoder(Decoder):
     """
 
     def decode(self):
-        # Look for array beginning
-        evt_name, evt_param = next(self.parser_gen)
-        if evt_name != "array_start":
-            raise ValueError("Json does not start with an array")
-
-        # Iterate for every element in array
-        while True:
-            # Collect single element
-            # It is not stored anywhere, greatly reducing memory footprint
-            is_data, value = self._parse_sub_tree()
+        # Elements are not stored anywhere, greatly reducing memory footprint
+        for _ in self.iter_items('item'):
+            pass
 
-            if not is_data:
-                break
+        if self.value.__class__ is not list:
+            raise ValueError("Json does not start with an array")
 
 
 def data_gen():
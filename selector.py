@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+
+import re
+from handler import Handler
+from numeric_arrays import is_typed_array
+
+
+# Path part matching any object key or array index
+WILDCARD = None
+
+# Path part matching the root value only, prepended to every selector
+ROOT = object()
+
+selector_part = re.compile(r'''\.([^.\[\]'"]+)|\[(\*)\]|\[([0-9]+)\]|\[(['"])(.*?)\4\]''')
+
+
+def parse_selector(selector):
+    """
+    Parse a JSONPath-like selector into a list of path parts.
+
+    Supported are "$" root, ".key" and "['key']" object keys, "[0]" array indices and ".*" or "[*]" wildcards,
+    e.g. "$.meta.id" or "$.items[*].price".
+
+    :param selector: selector string
+    :return: list of ROOT, keys, indices and WILDCARD parts
+    """
+    if not selector.startswith('$'):
+        raise ValueError("Selector '{}' does not start with '$'".format(selector))
+
+    parts = [ROOT]
+    pos = 1
+    while pos < len(selector):
+        match = selector_part.match(selector, pos)
+        if match is None:
+            raise ValueError("Unsupported selector '{}' at position {}".format(selector, pos))
+
+        key, wildcard, index, _, quoted_key = match.groups()
+        if wildcard is not None or key == '*':
+            parts.append(WILDCARD)
+        elif index is not None:
+            parts.append(int(index))
+        else:
+            parts.append(key if key is not None else quoted_key)
+        pos = match.end()
+
+    return parts
+
+
+class Selection(Handler):
+    """
+    Handler collecting values at paths matching selectors.
+
+    Only matching values are built, by passing their events on to a decoder. Other containers are walked while
+    some selector may still match inside them, and the rest, down to single strings and numbers in walked
+    containers, is either only validated by the parser, see Parser.materialize, or skipped, see Parser.skip().
+    """
+
+    def __init__(self, selectors, parser, decoder, validate=True):
+        """
+        :param selectors: iterable of selector strings
+        :param parser: parser pushing events to this handler
+        :param decoder: Decoder building matching values, its stack has to be empty
+        :param validate: validate values which cannot match any selector rather than skip them
+        """
+        self.validate = validate
+        self.selectors = list(selectors)
+        self.parts = [parse_selector(selector) for selector in self.selectors]
+        self.parser = parser
+        self.decoder = decoder
+        self.values = {selector: [] for selector in self.selectors}
+
+        # Partial matches inside current container as (selector number, count of matched parts) pairs
+        self.active = [(i, 0) for i in range(len(self.parts))]
+        self.is_array = False
+        self.index = 0
+        self.key = ROOT
+        # Enclosing containers as (active, is_array, index, key) tuples
+        self.frames = []
+
+        # Selectors matching the value being built, and partial matches to look up inside it once it is built
+        self.building = None
+        self.building_active = None
+        # Depth of the container being skipped
+        self.skip_depth = 0
+
+    def on_object_start(self):
+        self._start_container(False)
+
+    def on_object_end(self):
+        self._end_container()
+
+    def on_array_start(self):
+        self._start_container(True)
+
+    def on_array_end(self):
+        self._end_container()
+
+    def on_key(self, key):
+        if self.building is not None:
+            self.decoder.on_key(key)
+        elif self.skip_depth == 0:
+            self.key = key
+            if not any(self._matches(self.parts[i][count], key) for i, count in self.active):
+                if self.validate:
+                    self.parser.materialize = False
+                else:
+                    self.parser.skip()
+
+    def on_value(self, value):
+        if self.building is not None:
+            self.decoder.on_value(value)
+        elif self.skip_depth == 0:
+            matched, active = self._match(self._next_part())
+            self._add_value(matched, active, value)
+            self._prepare_next_value()
+
+    def _start_container(self, is_array):
+        if self.building is not None:
+            self._pass_start(is_array)
+        elif self.skip_depth > 0:
+            self.skip_depth += 1
+        else:
+            matched, active = self._match(self._next_part())
+            # Keys never match array elements, and indices never match object values
+            mismatching_part_class = str if is_array else int
+            active = [(i, count) for i, count in active if self.parts[i][count].__class__ is not mismatching_part_class]
+            if matched:
+                self.building = matched
+                self.building_active = active
+                self._pass_start(is_array)
+            elif active:
+                self.frames.append((self.active, self.is_array, self.index, self.key))
+                self.active = active
+                self.is_array = is_array
+                self.index = 0
+                self.key = None
+                self._prepare_next_value()
+            else:
+                self.skip_depth = 1
+                if self.validate:
+                    self.parser.materialize = False
+                else:
+                    self.parser.skip()
+
+    def _end_container(self):
+        if self.building is not None:
+            if self.decoder.container.__class__ is list:
+                self.decoder.on_array_end()
+            else:
+                self.decoder.on_object_end()
+
+            if self.decoder.container is None:
+                matched, active = self.building, self.building_active
+                self.building = None
+                self.building_active = None
+                self._add_value(matched, active, self.decoder.value)
+                self._prepare_next_value()
+        elif self.skip_depth > 0:
+            self.skip_depth -= 1
+            if self.skip_depth == 0:
+                self._prepare_next_value()
+        else:
+            self.active, self.is_array, self.index, self.key = self.frames.pop()
+            self._prepare_next_value()
+
+    def _pass_start(self, is_array):
+        if is_array:
+            self.decoder.on_array_start()
+        else:
+            self.decoder.on_object_start()
+
+    def _prepare_next_value(self):
+        """
+        Let the parser build next value in current container only if some selector may match it.
+
+        Keys of objects are always built, and values which cannot match are left unbuilt from on_key().
+        """
+        if self.is_array:
+            index = self.index
+            self.parser.materialize = any(self._matches(self.parts[i][count], index) for i, count in self.active)
+        else:
+            self.parser.materialize = True
+
+    def _next_part(self):
+        """
+        Path part of a value starting in current container.
+        """
+        if not self.is_array:
+            return self.key
+
+        index = self.index
+        self.index += 1
+        return index
+
+    def _match(self, part):
+        """
+        Match path part against partial matches of current container.
+
+        :return: numbers of fully matched selectors and partial matches inside the value with this path part
+        """
+        matched = []
+        active = []
+        for i, count in self.active:
+            if self._matches(self.parts[i][count], part):
+                if count + 1 == len(self.parts[i]):
+                    matched.append(i)
+                else:
+                    active.append((i, count + 1))
+
+        return matched, active
+
+    @staticmethod
+    def _matches(selector_part, part):
+        return selector_part == part or selector_part is WILDCARD and part is not ROOT
+
+    def _add_value(self, matched, active, value):
+        for i in matched:
+            self.values[self.selectors[i]].append(value)
+
+        # Selectors reaching further into a built value are matched against it
+        for i, count in active:
+            self._add_nested_values(i, value, count)
+
+    def _add_nested_values(self, i, value, count):
+        parts = self.parts[i]
+        part = parts[count]
+
+        if value.__class__ is dict:
+            if part is WILDCARD:
+                children = list(value.values())
+            elif part.__class__ is str and part in value:
+                children = [value[part]]
+            else:
+                return
+        elif value.__class__ is list or is_typed_array(value):
+            if value.__class__ is not list:
+                # Elements of arrays pushed as single values by the parser, see Decoder numeric_arrays
+                value = value.tolist()
+            if part is WILDCARD:
+                children = value
+            elif part.__class__ is int and part < len(value):
+                children = [value[part]]
+            else:
+                return
+        else:
+            return
+
+        for child in children:
+            if count + 1 == len(parts):
+                self.values[self.selectors[i]].append(child)
+            else:
+                self._add_nested_values(i, child, count + 1)
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+from bisect import bisect_left
+from handler import Handler
+from time import perf_counter
+
+
+class Stats:
+    """
+    Counters and timings collected by Decoder when passed as its stats argument.
+
+    Hooks on_chunk() and on_event() can be overridden to forward measurements elsewhere.
+    """
+
+    # Upper bounds in seconds of chunk latency histogram buckets, the last bucket counts slower chunks
+    latency_buckets = (1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0)
+
+    def __init__(self):
+        # Event counters keyed by event names of Parser.parse()
+        self.events = dict.fromkeys(
+            ["object_start", "object_end", "array_start", "array_end", "object_key_end", "value_end"],
+            0
+        )
+        self.chunks = 0
+        self.bytes = 0
+        # Chars are counted only when the parser decodes chunks, i.e. not in bytes mode
+        self.chars = 0
+        # Time spent in Parser.feed() and Parser.close(), including handler callbacks
+        self.feed_time = 0.0
+        # Time spent in handler callbacks, i.e. building objects
+        self.handler_time = 0.0
+        self.latency_histogram = [0] * (len(self.latency_buckets) + 1)
+
+    @property
+    def parser_time(self):
+        """
+        Time spent in the parser itself.
+        """
+        return self.feed_time - self.handler_time
+
+    def on_chunk(self, data, chars, elapsed):
+        """
+        Called after the parser has consumed a data chunk.
+
+        :param data: data chunk as fed to the parser
+        :param chars: count of chars in the chunk after decoding, None in bytes mode where chunks are not decoded
+        :param elapsed: time spent parsing the chunk
+        """
+        self.chunks += 1
+        if not isinstance(data, str):
+            self.bytes += len(data)
+        if chars is not None:
+            self.chars += chars
+        self.feed_time += elapsed
+        self.latency_histogram[bisect_left(self.latency_buckets, elapsed)] += 1
+
+    def on_event(self, event_name, elapsed):
+        """
+        Called after a handler callback has returned.
+
+        :param event_name: event name of Parser.parse()
+        :param elapsed: time spent in the callback
+        """
+        self.events[event_name] += 1
+        self.handler_time += elapsed
+
+
+class InstrumentedHandler(Handler):
+    """
+    Handler timing callbacks of a wrapped handler and reporting them to Stats.
+    """
+
+    def __init__(self, handler, stats):
+        self.handler = handler
+        self.stats = stats
+
+    def on_object_start(self):
+        start = perf_counter()
+        self.handler.on_object_start()
+        self.stats.on_event("object_start", perf_counter() - start)
+
+    def on_object_end(self):
+        start = perf_counter()
+        self.handler.on_object_end()
+        self.stats.on_event("object_end", perf_counter() - start)
+
+    def on_array_start(self):
+        start = perf_counter()
+        self.handler.on_array_start()
+        self.stats.on_event("array_start", perf_counter() - start)
+
+    def on_array_end(self):
+        start = perf_counter()
+        self.handler.on_array_end()
+        self.stats.on_event("array_end", perf_counter() - start)
+
+    def on_key(self, key):
+        start = perf_counter()
+        self.handler.on_key(key)
+        self.stats.on_event("object_key_end", perf_counter() - start)
+
+    def on_value(self, value):
+        start = perf_counter()
+        self.handler.on_value(value)
+        self.stats.on_event("value_end", perf_counter() - start)
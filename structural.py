@@ -0,0 +1,336 @@
+# -*- coding: utf-8 -*-
+
+import json
+import re
+from exceptions import ParseError
+from handler import Handler
+from parser import Parser, _EventBuffer
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+QUOTE = ord('"')
+BACKSLASH = ord('\\')
+STRUCTURAL_CHARS = b'{}[]:,'
+
+# Stage 1 patterns used without NumPy: next structural char or quote outside strings, and rest of a string up to
+# its closing quote
+structural_char = re.compile(rb'["{}\[\]:,]')
+str_literal_end = re.compile(rb'[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+
+if numpy is not None:
+    candidate_char_table = numpy.zeros(256, dtype=bool)
+    candidate_char_table[list(STRUCTURAL_CHARS + b'"')] = True
+
+
+def find_structurals(data, in_string=False, escaped=False, use_numpy=None):
+    """
+    Find offsets of quotes and of structural chars outside strings in a chunk of UTF-8 encoded data.
+
+    Quotes escaped by backslashes are not reported, nor are structural chars inside strings. String state is
+    carried over between chunks by passing values returned for previous chunk.
+
+    :param data: bytes of the chunk
+    :param in_string: whether the chunk starts inside a string
+    :param escaped: whether the first char of the chunk is escaped by a backslash ending previous chunk
+    :param use_numpy: classify all chars at once with NumPy, rather than jumping between them with regexes;
+        NumPy is used if it is available when None
+    :return: list of offsets, and in_string and escaped for next chunk
+    """
+    if use_numpy is None:
+        use_numpy = numpy is not None
+    if use_numpy:
+        return _find_structurals_numpy(data, in_string, escaped)
+    return _find_structurals_re(data, in_string, escaped)
+
+
+def _find_structurals_numpy(data, in_string, escaped):
+    chars = numpy.frombuffer(data, dtype=numpy.uint8)
+    # Offsets of all quotes and structural chars, few compared to the count of chars in strings
+    candidates = numpy.flatnonzero(candidate_char_table[chars])
+    is_quote = chars[candidates] == QUOTE
+
+    # Quotes preceded by backslashes are escaped if the backslash run is of odd length
+    quotes = candidates[is_quote]
+    preceded = quotes[chars[quotes - 1] == BACKSLASH] if not escaped else quotes
+    for offset in preceded.tolist():
+        pos = offset - 1
+        while pos >= 0 and data[pos] == BACKSLASH:
+            pos -= 1
+        run = offset - 1 - pos + (escaped if pos < 0 else 0)
+        if run % 2 == 1:
+            is_quote[numpy.searchsorted(candidates, offset)] = False
+
+    # Structural chars preceded by an odd count of quotes flip string state
+    quotes_before = numpy.cumsum(is_quote) - is_quote
+    is_outside = (quotes_before % 2).astype(bool) == in_string
+    positions = candidates[is_quote | is_outside].tolist()
+
+    in_string = bool(is_quote.sum() % 2) != in_string
+    trailing_run = len(data) - len(data.rstrip(b'\\')) if data[-1:] == b'\\' else 0
+    if trailing_run == len(data) and escaped:
+        trailing_run += 1
+
+    return positions, in_string, in_string and trailing_run % 2 == 1
+
+
+def _find_structurals_re(data, in_string, escaped):
+    positions = []
+    pos = 0
+    end = len(data)
+
+    while pos < end:
+        if not in_string:
+            match = structural_char.search(data, pos)
+            if match is None:
+                break
+            pos = match.end()
+            positions.append(pos - 1)
+            in_string = data[pos - 1] == QUOTE
+        elif escaped:
+            pos += 1
+            escaped = False
+        else:
+            match = str_literal_end.match(data, pos)
+            if match is None:
+                # A backslash run at the end escapes first char of next chunk if its length is odd
+                tail = data[pos:]
+                escaped = (len(tail) - len(tail.rstrip(b'\\'))) % 2 == 1
+                break
+            pos = match.end()
+            positions.append(pos - 1)
+            in_string = False
+
+    return positions, in_string, escaped
+
+
+class StructuralParser:
+    """
+    Two-stage parser of UTF-8 encoded data, pushing the same events as Parser.
+
+    Stage 1 finds quotes and structural chars of a whole chunk at once, see find_structurals(), and stage 2 walks
+    only those, checking the grammar and converting literals found between them. Chars inside strings are never
+    looked at one by one, which pays off on documents made mostly of strings.
+    """
+
+    class State:
+        VALUE = 0
+        ARRAY_START = 1
+        OBJECT_START = 2
+        KEY = 3
+        COLON = 4
+        AFTER_VALUE = 5
+
+    # Names of states by their values, for error messages
+    state_names = {value: name for name, value in vars(State).items() if not name.startswith('_')}
+
+    # Literal found between structural chars, stripped of whitespace
+    literal = re.compile(
+        rb'(-?(?:0|[1-9][0-9]*)(\.[0-9]+)?([eE][-+]?[0-9]+)?)|true|false|null|NaN|Infinity|-Infinity'
+    )
+    named_literals = {
+        b'true': True,
+        b'false': False,
+        b'null': None,
+        b'NaN': float('nan'),
+        b'Infinity': float('inf'),
+        b'-Infinity': float('-inf'),
+    }
+    whitespace = b' \t\n\r'
+    control_chars = re.compile(rb'[\x00-\x1f]')
+
+    def __init__(self, handler=None, use_numpy=None):
+        """
+        :param handler: Handler receiving events pushed with feed() and close()
+        :param use_numpy: run stage 1 with NumPy, see find_structurals()
+        """
+        self.use_numpy = use_numpy
+        self.state = self.State.VALUE
+        # Whether enclosing containers are objects rather than arrays
+        self.stack = []
+        # Stage 1 state carried over between chunks
+        self.in_string = False
+        self.escaped = False
+        # Parts of current string or of data between structural chars, carried over from previous chunks
+        self.string_parts = []
+        self.string_is_key = False
+        self.gap_parts = []
+        self.handler = handler if handler is not None else Handler()
+
+    @property
+    def handler(self):
+        return self._handler
+
+    @handler.setter
+    def handler(self, handler):
+        self._handler = handler
+        self._on_object_start = handler.on_object_start
+        self._on_object_end = handler.on_object_end
+        self._on_array_start = handler.on_array_start
+        self._on_array_end = handler.on_array_end
+        self._on_key = handler.on_key
+        self._on_value = handler.on_value
+
+    def parse(self, gen):
+        """
+        Parse data chunks from gen, yielding events as Parser.parse() does.
+
+        Replaces parser's handler.
+        """
+
+        buffer = _EventBuffer()
+        self.handler = buffer
+
+        for data in gen:
+            yield from Parser._flush_events(buffer.events, self.feed, data)
+
+        yield from Parser._flush_events(buffer.events, self.close)
+
+    def feed(self, data):
+        """
+        Parse data chunk, pushing events to the handler.
+
+        :param data: str or UTF-8 encoded bytes-like object
+        """
+
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        elif data.__class__ is not bytes:
+            # Parts of the chunk are carried over, and buffers behind other objects may be reused by the caller
+            data = bytes(data)
+
+        positions, self.in_string, self.escaped = find_structurals(data, self.in_string, self.escaped,
+                                                                   self.use_numpy)
+        State = self.State
+        pos = 0
+
+        for position in positions:
+            if self.string_parts:
+                self.string_parts.append(data[pos:position])
+                self._end_string(b''.join(self.string_parts))
+                self.string_parts = []
+                pos = position + 1
+                continue
+
+            if self.gap_parts:
+                self.gap_parts.append(data[pos:position])
+                self._gap(b''.join(self.gap_parts))
+                self.gap_parts = []
+            elif position > pos:
+                self._gap(data[pos:position])
+            pos = position + 1
+
+            ch = data[position]
+            state = self.state
+            if ch == QUOTE:
+                if state == State.VALUE or state == State.ARRAY_START:
+                    self.string_is_key = False
+                elif state == State.OBJECT_START or state == State.KEY:
+                    self.string_is_key = True
+                else:
+                    self._raise_parse_error(ch, position)
+                # Empty first part marks being inside a string
+                self.string_parts = [b'']
+            elif ch == 0x7b or ch == 0x5b:  # { [
+                if state != State.VALUE and state != State.ARRAY_START:
+                    self._raise_parse_error(ch, position)
+                if ch == 0x7b:
+                    self.stack.append(True)
+                    self.state = State.OBJECT_START
+                    self._on_object_start()
+                else:
+                    self.stack.append(False)
+                    self.state = State.ARRAY_START
+                    self._on_array_start()
+            elif ch == 0x7d or ch == 0x5d:  # } ]
+                is_object = ch == 0x7d
+                if not (
+                    state == (State.OBJECT_START if is_object else State.ARRAY_START) or
+                    state == State.AFTER_VALUE and self.stack and self.stack[-1] == is_object
+                ):
+                    self._raise_parse_error(ch, position)
+                self.stack.pop()
+                self.state = State.AFTER_VALUE
+                if is_object:
+                    self._on_object_end()
+                else:
+                    self._on_array_end()
+            elif ch == 0x3a:  # :
+                if state != State.COLON:
+                    self._raise_parse_error(ch, position)
+                self.state = State.VALUE
+            else:  # ,
+                if state != State.AFTER_VALUE or not self.stack:
+                    self._raise_parse_error(ch, position)
+                self.state = State.KEY if self.stack[-1] else State.VALUE
+
+        if self.string_parts:
+            self.string_parts.append(data[pos:])
+        elif pos < len(data):
+            self.gap_parts.append(data[pos:])
+
+    def close(self):
+        """
+        Signal end of data, pushing remaining events to the handler.
+        """
+
+        if self.string_parts:
+            raise ParseError("Parse error: unterminated string at end of data")
+
+        if self.gap_parts:
+            self._gap(b''.join(self.gap_parts))
+            self.gap_parts = []
+
+        if self.state != self.State.AFTER_VALUE or self.stack:
+            raise ParseError("Parse error: unexpected end of data")
+
+    def _gap(self, gap):
+        """
+        Check data between structural chars, pushing a value if it is a literal.
+        """
+        token = gap.strip(self.whitespace)
+        if not token:
+            return
+
+        match = self.literal.fullmatch(token)
+        if match is None or self.state != self.State.VALUE and self.state != self.State.ARRAY_START:
+            raise ParseError("Parse error: unexpected data {!r}".format(token[:20]))
+
+        self.state = self.State.AFTER_VALUE
+        if match.group(1) is None:
+            self._on_value(self.named_literals[token])
+        elif match.group(2) is None and match.group(3) is None:
+            self._on_value(int(token))
+        else:
+            self._on_value(float(token))
+
+    def _end_string(self, token):
+        """
+        Decode string token ended by quote, pushing it as a key or a value.
+        """
+        if self.control_chars.search(token) is not None:
+            raise ParseError("Parse error: control char in string {!r}".format(token[:20]))
+
+        value = token.decode('utf-8')
+        if '\\' in value:
+            try:
+                value = json.loads('"' + value + '"')
+            except json.decoder.JSONDecodeError:
+                raise ParseError("Parse error: invalid escape in string {!r}".format(token[:20]))
+
+        if self.string_is_key:
+            self.state = self.State.COLON
+            self._on_key(value)
+        else:
+            self.state = self.State.AFTER_VALUE
+            self._on_value(value)
+
+    def _raise_parse_error(self, ch, position):
+        raise ParseError("Parse error: unexpected char '{}' in state {} (local index {})".format(
+            chr(ch),
+            self.state_names[self.state],
+            position
+        ))
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+
+from async_parser import AsyncParser
+from async_decoder import AsyncDecoder
+from exceptions import ParseError
+from parser import Parser
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+async def iter_chunks(data, chunk_size):
+    for i in range(0, len(data), chunk_size):
+        yield data[i:i + chunk_size]
+
+
+class TestAsync(unittest.TestCase):
+
+    def testParse(self):
+        data = '{"a": [1, "x"], "b": null}'.encode('utf-8')
+        expected_events = [
+            ("object_start", None),
+            ("object_key_end", "a"),
+            ("array_start", None),
+            ("value_end", 1),
+            ("value_end", "x"),
+            ("array_end", None),
+            ("object_key_end", "b"),
+            ("value_end", None),
+            ("object_end", None),
+        ]
+
+        async def collect(parser, source):
+            return [event async for event in parser.parse(source)]
+
+        for bytes_mode in [False, True]:
+            for chunk_size in [1, 3, len(data)]:
+                for yield_every in [1, 4, 65536]:
+                    with self.subTest(bytes_mode=bytes_mode, chunk_size=chunk_size, yield_every=yield_every):
+                        parser = AsyncParser(bytes_mode=bytes_mode, yield_every=yield_every)
+                        events = run(collect(parser, iter_chunks(data, chunk_size)))
+                        self.assertEqual(events, expected_events)
+
+        async def collect_until_error():
+            events = []
+            with self.assertRaises(ParseError):
+                async for event in AsyncParser().parse(iter_chunks('[1, "a", x]', 100)):
+                    events.append(event)
+            return events
+
+        self.assertEqual(run(collect_until_error()), [("array_start", None), ("value_end", 1), ("value_end", "a")])
+
+    def testStreamReader(self):
+        value = {"items": [{"id": i, "name": "имя %d" % i} for i in range(100)]}
+        data = json.dumps(value, ensure_ascii=False).encode('utf-8')
+
+        async def decode():
+            reader = asyncio.StreamReader()
+            reader.feed_data(data)
+            reader.feed_eof()
+            return await AsyncDecoder(reader, yield_every=100).decode()
+
+        self.assertEqual(run(decode()), value)
+
+    def testFromFile(self):
+        value = {"items": [{"id": i, "name": "имя %d" % i} for i in range(100)]}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'data.json')
+            with open(path, 'w', encoding='utf-8') as fp:
+                json.dump(value, fp, ensure_ascii=False)
+
+            decoder = AsyncDecoder.from_file(path, chunk_size=64, yield_every=100, bytes_mode=True)
+            self.assertEqual(run(decoder.decode()), value)
+
+            async def collect(events):
+                return [event async for event in events]
+
+            events = run(collect(AsyncParser(bytes_mode=True, yield_every=100).parse_file(path, chunk_size=64)))
+            with open(path, 'rb') as fp:
+                expected_events = list(Parser(bytes_mode=True).parse([fp.read()]))
+            self.assertEqual(events, expected_events)
+
+    def testIterItems(self):
+        data = '{"results": [{"a": 1}, [2], "x"], "other": [3]}'
+
+        async def collect(items):
+            return [item async for item in items]
+
+        async def select():
+            return await AsyncDecoder(iter_chunks(data, 5)).select(["$.results[1]", "$.other[*]"])
+
+        for chunk_size in [1, 7, len(data)]:
+            with self.subTest(chunk_size=chunk_size):
+                decoder = AsyncDecoder(iter_chunks(data, chunk_size), yield_every=3)
+                self.assertEqual(run(collect(decoder.iter_items('results.item'))), [{"a": 1}, [2], "x"])
+
+        decoder = AsyncDecoder(iter_chunks('{"a": 1}\n[2]\n"x"\n', 4))
+        self.assertEqual(run(collect(decoder.iter_documents())), [{"a": 1}, [2], "x"])
+        self.assertEqual(run(select()), {"$.results[1]": [[2]], "$.other[*]": [3]})
+
+    def testYieldsToEventLoop(self):
+        data = json.dumps(list(range(10000)))
+        ticks = []
+
+        async def tick(done):
+            while not done.is_set():
+                ticks.append(None)
+                await asyncio.sleep(0)
+
+        async def decode():
+            done = asyncio.Event()
+            ticker = asyncio.ensure_future(tick(done))
+            value = await AsyncDecoder(iter_chunks(data, len(data)), yield_every=1000).decode()
+            done.set()
+            await ticker
+            return value
+
+        self.assertEqual(run(decode()), list(range(10000)))
+        self.assertGreater(len(ticks), len(data) // 1000 - 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,14 +13,33 @@ class TestDecoder(unittest.TestCase):
 
     # Adapted from python json tests
     def testRecursion(self):
-        with self.assertRaises(RecursionError):
-            decoder = Decoder(s for s in ['{"a":' * 100000 + '1' + '}' * 100000])
-            decoder.decode()
-        with self.assertRaises(RecursionError):
-            decoder = Decoder(s for s in ['{"a":' * 100000 + '[1]' + '}' * 100000])
+        decoder = Decoder(s for s in ['{"a":' * 100000 + '1' + '}' * 100000])
+        value = decoder.decode()
+        for _ in range(100000):
+            value = value["a"]
+        self.assertEqual(value, 1)
+
+        decoder = Decoder(s for s in ['{"a":' * 100000 + '[1]' + '}' * 100000])
+        value = decoder.decode()
+        for _ in range(100000):
+            value = value["a"]
+        self.assertEqual(value, [1])
+
+        decoder = Decoder(s for s in ['[' * 100000 + '1' + ']' * 100000])
+        value = decoder.decode()
+        for _ in range(100000):
+            value, = value
+        self.assertEqual(value, 1)
+
+    def testMaxDepth(self):
+        decoder = Decoder(['[[{"a": [1]}]]'], max_depth=4)
+        self.assertEqual(decoder.decode(), [[{"a": [1]}]])
+
+        with self.assertRaises(ParseError):
+            decoder = Decoder(['[[{"a": [[1]]}]]'], max_depth=4)
             decoder.decode()
-        with self.assertRaises(RecursionError):
-            decoder = Decoder(s for s in ['[' * 100000 + '1' + ']' * 100000])
+        with self.assertRaises(ParseError):
+            decoder = Decoder(['[' * 100000 + ']' * 100000], max_depth=1000)
             decoder.decode()
 
     # Adapted from python json tests
@@ -2,6 +2,9 @@
 
 from decoder import Decoder
 from parser import ParseError
+from stats import Stats
+from array import array
+import numeric_arrays
 import unittest
 import json
 import math
@@ -37,11 +40,225 @@ class TestDecoder(unittest.TestCase):
                 else:
                     self.assertTrue(math.isnan(json_d))
 
+    def testChunkedStrings(self):
+        data = json.dumps({
+            'text': 'lorem "ipsum" \\ dolor\t\u00e9\u4e16\U0001f600 ' * 50,
+            'line\u2028separator': '\u2029',
+            '': '',
+        }, ensure_ascii=False)
+
+        for chunk_size in [1, 2, 5, 64, len(data)]:
+            with self.subTest(chunk_size=chunk_size):
+                decoder = Decoder(data[i:i + chunk_size] for i in range(0, len(data), chunk_size))
+                self.assertEqual(decoder.decode(), json.loads(data))
+
+    def testChunkedLiterals(self):
+        data = '[0, -0, 12, -3.5, 1e5, 0e1, 2.5E-3, true,false,null, Infinity,\n-Infinity, "-", 7]'
+
+        for chunk_size in range(1, 12):
+            with self.subTest(chunk_size=chunk_size):
+                decoder = Decoder(data[i:i + chunk_size] for i in range(0, len(data), chunk_size))
+                self.assertEqual(decoder.decode(), json.loads(data))
+
+    def testIterItems(self):
+        data = '{"meta": {"count": 3}, "results": [{"id": 1, "tags": ["a"]}, [2], 3], "item": ["x"]}'
+        cases = [
+            ('results.item', [{"id": 1, "tags": ["a"]}, [2], 3]),
+            ('results.item.tags.item', ["a"]),
+            ('results.item.item', [2]),
+            ('meta.count', [3]),
+            ('meta', [{"count": 3}]),
+            ('item.item', ["x"]),
+            ('item', [["x"]]),
+            ('', [json.loads(data)]),
+        ]
+
+        for prefix, expected_items in cases:
+            for chunk_size in [1, 5, len(data)]:
+                with self.subTest(prefix=prefix, chunk_size=chunk_size):
+                    decoder = Decoder(data[i:i + chunk_size] for i in range(0, len(data), chunk_size))
+                    self.assertEqual(list(decoder.iter_items(prefix)), expected_items)
+
+        decoder = Decoder(['[{"a": 1}, {"a": 2}]'])
+        self.assertEqual(list(decoder.iter_items('item')), [{"a": 1}, {"a": 2}])
+        self.assertEqual(decoder.value, [])
+
+    def testIterDocuments(self):
+        cases = [
+            ('{"a": 1}\n{"b": [2]}\n\n"c"\n', [{"a": 1}, {"b": [2]}, "c"]),
+            ('[1][2]{}3 "x"true null', [[1], [2], {}, 3, "x", True, None]),
+            ('\x1e{"a": 1}\n\x1e[2]\n', [{"a": 1}, [2]]),
+            (' \n', []),
+        ]
+
+        for data, expected_documents in cases:
+            for chunk_size in [1, 2, len(data) or 1]:
+                with self.subTest(data=data, chunk_size=chunk_size):
+                    decoder = Decoder(data[i:i + chunk_size] for i in range(0, len(data), chunk_size))
+                    self.assertEqual(list(decoder.iter_documents()), expected_documents)
+
+        for data in ['[1]]', '[1],[2]', '[\x1e1]', '{"a": 1}\n{"b"}']:
+            with self.subTest(data=data):
+                with self.assertRaises(ParseError):
+                    list(Decoder([data]).iter_documents())
+
+    def testSelect(self):
+        data = '{"meta": {"id": 7, "tags": ["a", "b"]}, "items": [{"price": 1.5, "x": [1, 2]}, {"price": 2}, {}], "$": 0}'
+        expected_values = {
+            '$.meta.id': [7],
+            '$.items[*].price': [1.5, 2],
+            '$.meta': [{"id": 7, "tags": ["a", "b"]}],
+            '$.meta.tags[1]': ["b"],
+            "$['items'][0].x.*": [1, 2],
+            '$.*.tags': [["a", "b"]],
+            '$.$': [0],
+            '$.missing': [],
+            '$': [json.loads(data)],
+        }
+
+        for chunk_size in [1, 5, len(data)]:
+            with self.subTest(chunk_size=chunk_size):
+                decoder = Decoder(data[i:i + chunk_size] for i in range(0, len(data), chunk_size))
+                self.assertEqual(decoder.select(expected_values.keys()), expected_values)
+                decoder = Decoder(data[i:i + chunk_size] for i in range(0, len(data), chunk_size))
+                self.assertEqual(decoder.select(expected_values.keys(), validate=False), expected_values)
+
+        # Values not matching selectors are only validated, also scalars inside walked containers
+        data = '{"meta": {"blob": "a\\nb", "id": "x\\ty", "n": 1.5}, "items": [2.5, "\\u00e9", 3.5]}'
+        for chunk_size in [1, 5, len(data)]:
+            with self.subTest(chunk_size=chunk_size):
+                floats = []
+                decoder = Decoder((data[i:i + chunk_size] for i in range(0, len(data), chunk_size)),
+                                  parse_float=lambda literal: floats.append(literal) or float(literal))
+                decoded = []
+                decode_string_literal = decoder.parser._decode_string_literal
+                decoder.parser._decode_string_literal = lambda token, ch: decoded.append(token) or \
+                    decode_string_literal(token, ch)
+                self.assertEqual(decoder.select(['$.meta.id', '$.items[2]']),
+                                 {'$.meta.id': ['x\ty'], '$.items[2]': [3.5]})
+                self.assertEqual([token for token in decoded if '\\' in token], ['x\\ty'])
+                self.assertEqual(floats, ['3.5'])
+
+        with self.assertRaises(ParseError):
+            decoder = Decoder(['{"a": 1, "b": [1, 2,]}'])
+            decoder.select(['$.a'])
+        decoder = Decoder(['{"a": 1, "b": [1, 2,]}'])
+        self.assertEqual(decoder.select(['$.a'], validate=False), {'$.a': [1]})
+        for selector in ['meta', '$..id', '$.items[-1]']:
+            with self.subTest(selector=selector):
+                with self.assertRaises(ValueError):
+                    Decoder(['{}']).select([selector])
+
+    def testDecodeColumns(self):
+        data = json.dumps([
+            {"ts": 1, "v": 1.5, "host": "a", "n": 1, "big": 1.5},
+            {"ts": 2, "v": 2, "host": "b", "n": 2.5, "big": 2 ** 60},
+            {"ts": 3, "v": -0.5, "host": "c", "extra": True, "big": 0.5},
+        ])
+        for chunk_size in [1, 10, len(data)]:
+            with self.subTest(chunk_size=chunk_size):
+                columns = Decoder(data[i:i + chunk_size] for i in range(0, len(data), chunk_size)).decode_columns()
+                self.assertEqual(columns, {
+                    "ts": array('q', [1, 2, 3]),
+                    "v": array('d', [1.5, 2.0, -0.5]),
+                    "host": ["a", "b", "c"],
+                    "n": [1, 2.5, None],
+                    "extra": [None, None, True],
+                    "big": [1.5, 2 ** 60, 0.5],
+                })
+
+        self.assertEqual(Decoder(['{"rows": [{"a": 1}, {"a": 2}]}']).decode_columns('rows'), {"a": array('q', [1, 2])})
+        self.assertEqual(Decoder(['[]']).decode_columns(), {})
+        with self.assertRaises(ValueError):
+            Decoder(['[{"a": 1}, 2]']).decode_columns()
+
+    def testNumericArrays(self):
+        data = '{"f": [0.5, -1, 2e3 ], "i": [1,-2, 30], "big": [1, %d], "mixed": [1, true], "e": [], ' \
+               '"n": [[1, 2], [3.5]], "nan": [1.5, NaN], "inexact": [1.5, 9007199254740993], ' \
+               '"exact": [-1.5, -9007199254740992, 1e300]}' % 2 ** 70
+        for bytes_mode in [False, True]:
+            for chunk_size in [1, 10, len(data)]:
+                with self.subTest(bytes_mode=bytes_mode, chunk_size=chunk_size):
+                    chunks = [data[i:i + chunk_size].encode() for i in range(0, len(data), chunk_size)]
+                    value = Decoder(chunks, bytes_mode=bytes_mode, numeric_arrays='array').decode()
+                    self.assertEqual(value.pop("nan")[:1], array('d', [1.5]))
+                    self.assertEqual(value, {
+                        "f": array('d', [0.5, -1.0, 2000.0]),
+                        "i": array('q', [1, -2, 30]),
+                        "big": [1, 2 ** 70],
+                        "mixed": [1, True],
+                        "e": [],
+                        "n": [array('q', [1, 2]), array('d', [3.5])],
+                        "inexact": [1.5, 9007199254740993],
+                        "exact": array('d', [-1.5, -9007199254740992.0, 1e300]),
+                    })
+
+        data = '{"a":[1,2,3],"b":{"c":[4.5,5]},"d":[[6,7]]}'
+        expected_values = {
+            '$.a[1]': [2],
+            '$.b.c[*]': [4.5, 5],
+            '$.b.c': [array('d', [4.5, 5])],
+            '$.d[0][*]': [6, 7],
+            '$.a.x': [],
+        }
+        for chunk_size in [1, 3, len(data)]:
+            with self.subTest(chunk_size=chunk_size):
+                chunks = [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]
+                self.assertEqual(Decoder(chunks, numeric_arrays='array').select(expected_values.keys()),
+                                 expected_values)
+                self.assertEqual(list(Decoder(chunks, numeric_arrays='array').iter_items('a.item')), [1, 2, 3])
+                self.assertEqual(list(Decoder(chunks, numeric_arrays='array').iter_items('d.item.item')), [6, 7])
+                self.assertEqual(list(Decoder(chunks, numeric_arrays='array').iter_items('b.c')),
+                                 [array('d', [4.5, 5])])
+                self.assertEqual(list(Decoder(['[1, 2]'], numeric_arrays='array').iter_items('item')), [1, 2])
+
+        with self.assertRaises(ValueError):
+            Decoder([], numeric_arrays='list')
+        with self.assertRaises(ValueError):
+            Decoder([], numeric_arrays='array', parse_float=float)
+
+    @unittest.skipIf(numeric_arrays.numpy is None, "NumPy is not installed")
+    def testNumericArraysNumpy(self):
+        value = Decoder(['[[0.5, 1], [1, 2]]'], numeric_arrays='numpy').decode()
+        self.assertEqual([item.dtype.char for item in value], ['d', 'q'])
+        self.assertEqual([item.tolist() for item in value], [[0.5, 1.0], [1, 2]])
+
+    def testStats(self):
+        data = '{"a": [1, "é", null], "b": {}}'
+        chunks = [data[:7], data[7:].encode('utf-8')]
+
+        stats = Stats()
+        decoder = Decoder(chunks, stats=stats)
+        self.assertEqual(decoder.decode(), json.loads(data))
+
+        self.assertEqual(stats.events, {
+            "object_start": 2,
+            "object_end": 2,
+            "array_start": 1,
+            "array_end": 1,
+            "object_key_end": 2,
+            "value_end": 3,
+        })
+        self.assertEqual(stats.chunks, 2)
+        self.assertEqual(stats.bytes, len(data[7:].encode('utf-8')))
+        self.assertEqual(stats.chars, len(data))
+        self.assertEqual(sum(stats.latency_histogram), 2)
+
+        stats = Stats()
+        Decoder([data.encode('utf-8')], stats=stats, bytes_mode=True).decode()
+        self.assertEqual(stats.bytes, len(data.encode('utf-8')))
+        self.assertEqual(stats.chars, 0)
+        self.assertGreaterEqual(stats.parser_time, 0)
+        self.assertGreater(stats.handler_time, 0)
+
     def testFailures(self):
         test_datum = [
             '+Infinity'
             '1..00',
             '1.e1',
+            '[\f1]',
+            '\u2028[]',
+            '["\x1f"]',
         ]
 
         for test_data in test_datum:
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+from indexed import IndexedJsonFile, build_index
+from exceptions import ParseError
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+
+class TestIndexedJsonFile(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'data.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def _write(self, data):
+        with open(self.path, 'w', encoding='utf-8') as fp:
+            fp.write(data)
+
+    def testElements(self):
+        elements = [1, -2.5e3, "ключ,]", {"a": [1, {"b": "]"}]}, [], None, True, 12345, [[1], 2], "x"]
+        data = json.dumps(elements, ensure_ascii=False, indent=2)
+        for chunk_data in [data, data.replace(' ', '').replace('\n', '')]:
+            with self.subTest(data=chunk_data[:20]):
+                self._write(chunk_data)
+                indexed = IndexedJsonFile(self.path)
+                self.assertEqual(len(indexed), len(elements))
+                self.assertEqual([indexed[i] for i in range(len(elements))], elements)
+                self.assertEqual(indexed[-1], "x")
+                self.assertEqual(indexed[2:5], elements[2:5])
+                self.assertEqual(indexed[::3], elements[::3])
+                with self.assertRaises(IndexError):
+                    indexed[len(elements)]
+                os.remove(self.path + '.idx')
+
+                expected_boundaries = build_index(self.path)
+                for chunk_size in [1, 2, 3, 7]:
+                    self.assertEqual(build_index(self.path, chunk_size=chunk_size), expected_boundaries)
+
+    def testPrefix(self):
+        data = '{"meta": {"items": [0]}, "other": [9], "rows": [{"id": 1}, 2, "3"], "after": [4]}'
+        self._write(data)
+        self.assertEqual(IndexedJsonFile(self.path, 'rows')[:], [{"id": 1}, 2, "3"])
+        self.assertEqual(IndexedJsonFile(self.path, 'meta.items', self.path + '.items')[:], [0])
+        self.assertEqual(len(build_index(self.path, 'after')), 2)
+
+        for prefix in ['', 'meta', 'missing', 'rows.id']:
+            with self.subTest(prefix=prefix):
+                with self.assertRaises(ValueError):
+                    build_index(self.path, prefix)
+
+        self._write('[1, 2')
+        with self.assertRaises(ParseError):
+            build_index(self.path)
+
+    def testIndexFile(self):
+        self._write('[1, 2, 3]')
+        self.assertEqual(len(IndexedJsonFile(self.path)), 3)
+        self.assertTrue(os.path.exists(self.path + '.idx'))
+
+        # Index is read from the file while the data file is unchanged
+        with open(self.path + '.idx', 'rb') as fp:
+            header = fp.readline()
+        with open(self.path + '.idx', 'wb') as fp:
+            fp.write(header + b'\x00' * 8 * 2)
+        self.assertEqual(len(IndexedJsonFile(self.path)), 1)
+
+        # A truncated index is rebuilt
+        with open(self.path + '.idx', 'wb') as fp:
+            fp.write(header + b'\x00' * 12)
+        self.assertEqual(len(IndexedJsonFile(self.path)), 3)
+        self.assertEqual(sorted(os.listdir(self.dir)), ['data.json', 'data.json.idx'])
+
+        self._write('[1, 2, 3, [4]]')
+        indexed = IndexedJsonFile(self.path)
+        self.assertEqual(len(indexed), 4)
+        self.assertEqual(indexed[3], [4])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -57,5 +57,14 @@ class TestDecoder(unittest.TestCase):
                     self.fail(msg="Fixture not failed: " + fixture_filename)
 
 
+    def testMappedPassFixtures(self):
+        for fixture_filename in glob.glob(self.cur_dir + "/json-checker/pass*"):
+            for bytes_mode in [False, True]:
+                with self.subTest(fixture_filename=os.path.basename(fixture_filename), bytes_mode=bytes_mode):
+                    with open(fixture_filename, 'r') as fixture_file:
+                        reference_data = json.loads(fixture_file.read())
+                    decoder = Decoder.from_file(fixture_filename, chunk_size=3, bytes_mode=bytes_mode)
+                    self.assertTrue(deep_eq.deep_eq(decoder.decode(), reference_data))
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+from lazy import LazyDecoder, LazyObject, LazyArray
+from exceptions import ParseError
+import glob
+import json
+import mmap
+import os
+import tempfile
+import unittest
+
+
+class TestLazyDecoder(unittest.TestCase):
+
+    cur_dir = os.path.dirname(os.path.realpath(__file__))
+
+    def testAccess(self):
+        data = '{"a": {"b": [1, 2.5, "x\\n\\u00e9", null]}, "c\\"": [[], {}], "d": "]}", "e": -1e3, "a": [true]}'
+        for document in [data, data.encode('utf-8'), memoryview(data.encode('utf-8'))]:
+            with self.subTest(document_type=type(document)):
+                root = LazyDecoder(document).decode()
+                self.assertIsInstance(root, LazyObject)
+                self.assertEqual(list(root), ["a", "c\"", "d", "e"])
+                self.assertIsInstance(root["a"], LazyArray)
+                self.assertIs(root["a"], root["a"])
+                self.assertEqual(root["a"][0], True)
+                self.assertEqual(root["c\""][0][:], [])
+                self.assertEqual(len(root["c\""][1]), 0)
+                self.assertEqual(root["d"], "]}")
+                self.assertEqual(root["e"], -1000.0)
+                self.assertNotIn("b", root)
+                self.assertEqual(root.to_python(), json.loads(data))
+
+    def testValuesDecodedOnAccess(self):
+        root = LazyDecoder('[{"ok": [1, 2]}, {"bad": [1, tru]}, 1x]').decode()
+        self.assertEqual(len(root), 3)
+        self.assertEqual(root[0]["ok"][-1], 2)
+        self.assertEqual(list(root[1]), ["bad"])
+        self.assertIn("bad", root[1])
+        self.assertEqual(root[1]["bad"][0], 1)
+        with self.assertRaises(ParseError):
+            root[1]["bad"][1]
+        with self.assertRaises(ParseError):
+            root[2]
+        self.assertEqual(root[0]["ok"][:], [1, 2])
+
+    def testScalarsAndErrors(self):
+        self.assertEqual(LazyDecoder(' "x" ').decode(), "x")
+        self.assertEqual(LazyDecoder(b'12').decode(), 12)
+
+        for data in ['', '[1, 2', '[1, 2]]', '{"a" 1}', '[1,]', '[1 2]', '["a]', '{"a": 1} x', '1 2', '{1: 2}']:
+            with self.subTest(data=data):
+                with self.assertRaises(ParseError):
+                    root = LazyDecoder(data).decode()
+                    root.to_python()
+                    list(root)
+
+    def testPassFixtures(self):
+        for fixture_filename in glob.glob(self.cur_dir + "/json-checker/pass*"):
+            with self.subTest(fixture_filename=os.path.basename(fixture_filename)):
+                with open(fixture_filename, 'rb') as fixture_file:
+                    reference_data = json.loads(fixture_file.read().decode('utf-8'))
+                decoder = LazyDecoder.from_file(fixture_filename)
+                self.assertIsInstance(decoder.data, mmap.mmap)
+                self.assertEqual(self._materialize(decoder.decode()), reference_data)
+
+    def testFromFile(self):
+        fd, path = tempfile.mkstemp()
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as fp:
+                fp.write('{"ключ": ["значение", 1]}')
+            self.assertEqual(LazyDecoder.from_file(path).decode()["ключ"][0], "значение")
+
+            open(path, 'w').close()
+            with self.assertRaises(ParseError):
+                LazyDecoder.from_file(path).decode()
+        finally:
+            os.remove(path)
+
+    def _materialize(self, value):
+        if isinstance(value, LazyObject):
+            return {key: self._materialize(value[key]) for key in value}
+        if isinstance(value, LazyArray):
+            return [self._materialize(item) for item in value]
+        return value
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+from parallel import decode_ndjson_parallel
+from exceptions import ParseError
+import io
+import json
+import os
+import tempfile
+import unittest
+
+
+class TestParallel(unittest.TestCase):
+
+    def setUp(self):
+        self.documents = [{"id": i, "name": "é" * (i % 7), "tags": list(range(i % 5))} for i in range(200)]
+        self.data = ''.join(json.dumps(document, ensure_ascii=False) + '\n' for document in self.documents)
+
+        fd, self.path = tempfile.mkstemp(suffix='.ndjson')
+        with os.fdopen(fd, 'w', encoding='utf-8') as fp:
+            fp.write(self.data)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def testFile(self):
+        for range_size in [1, 100, 1 << 20]:
+            with self.subTest(range_size=range_size):
+                documents = list(decode_ndjson_parallel(self.path, workers=2, range_size=range_size))
+                self.assertEqual(documents, self.documents)
+
+        documents = list(decode_ndjson_parallel(self.path, workers=2, ordered=False, range_size=100))
+        self.assertEqual(sorted(documents, key=lambda document: document["id"]), self.documents)
+
+    def testStream(self):
+        for stream in [io.BytesIO(self.data.encode('utf-8')), io.StringIO(self.data)]:
+            with self.subTest(stream=stream):
+                documents = list(decode_ndjson_parallel(stream, workers=2, range_size=100))
+                self.assertEqual(documents, self.documents)
+
+    def testErrors(self):
+        stream = io.StringIO(self.data + '{"id": }\n')
+        with self.assertRaises(ParseError):
+            list(decode_ndjson_parallel(stream, workers=2, range_size=100))
+
+
+if __name__ == '__main__':
+    unittest.main()
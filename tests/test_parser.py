@@ -0,0 +1,431 @@
+# -*- coding: utf-8 -*-
+
+from parser import Parser
+from handler import Handler
+from exceptions import ParseError
+from decimal import Decimal
+import glob
+import os
+import tempfile
+import unittest
+
+
+class RecordingHandler(Handler):
+
+    def __init__(self):
+        self.calls = []
+
+    def on_object_start(self):
+        self.calls.append(("on_object_start",))
+
+    def on_object_end(self):
+        self.calls.append(("on_object_end",))
+
+    def on_array_start(self):
+        self.calls.append(("on_array_start",))
+
+    def on_array_end(self):
+        self.calls.append(("on_array_end",))
+
+    def on_key(self, key):
+        self.calls.append(("on_key", key))
+
+    def on_value(self, value):
+        self.calls.append(("on_value", value))
+
+
+class TestParser(unittest.TestCase):
+
+    def testEvents(self):
+        data = '{"a": [1, 2.5, "x"], "b": {}, "c": null}'
+        expected_events = [
+            ("object_start", None),
+            ("object_key_end", "a"),
+            ("array_start", None),
+            ("value_end", 1),
+            ("value_end", 2.5),
+            ("value_end", "x"),
+            ("array_end", None),
+            ("object_key_end", "b"),
+            ("object_start", None),
+            ("object_end", None),
+            ("object_key_end", "c"),
+            ("value_end", None),
+            ("object_end", None),
+        ]
+
+        for chunk_size in [1, 3, len(data)]:
+            with self.subTest(chunk_size=chunk_size):
+                parser = Parser()
+                events = list(parser.parse(data[i:i + chunk_size] for i in range(0, len(data), chunk_size)))
+                self.assertEqual(events, expected_events)
+
+    def testEventsBeforeError(self):
+        parser = Parser()
+        events = []
+        with self.assertRaises(ParseError):
+            for event in parser.parse(s for s in ['[1, "a", x]']):
+                events.append(event)
+
+        self.assertEqual(events, [("array_start", None), ("value_end", 1), ("value_end", "a")])
+
+    def testFeed(self):
+        data = '{"a": [1, 2.5, "x"], "b": {}, "c": [[], true]}'
+        expected_calls = [
+            ("on_object_start",),
+            ("on_key", "a"),
+            ("on_array_start",),
+            ("on_value", 1),
+            ("on_value", 2.5),
+            ("on_value", "x"),
+            ("on_array_end",),
+            ("on_key", "b"),
+            ("on_object_start",),
+            ("on_object_end",),
+            ("on_key", "c"),
+            ("on_array_start",),
+            ("on_array_start",),
+            ("on_array_end",),
+            ("on_value", True),
+            ("on_array_end",),
+            ("on_object_end",),
+        ]
+
+        for chunk_size in [1, 4, len(data)]:
+            with self.subTest(chunk_size=chunk_size):
+                handler = RecordingHandler()
+                parser = Parser(handler)
+                for i in range(0, len(data), chunk_size):
+                    parser.feed(data[i:i + chunk_size])
+                parser.close()
+                self.assertEqual(handler.calls, expected_calls)
+
+    def testFeedTrailingNumber(self):
+        handler = RecordingHandler()
+        parser = Parser(handler)
+        parser.feed('12')
+        parser.feed('3')
+        self.assertEqual(handler.calls, [])
+        parser.close()
+        self.assertEqual(handler.calls, [("on_value", 123)])
+
+    def testTokenAcrossChunks(self):
+        value = 'x' * 5000 + '\\n\\u00e9' + 'y' * 5000
+        data = '{"%s": ["%s", -12345.5e-3]}' % (value, value)
+        for chunk_size in [1, 7, 1000]:
+            with self.subTest(chunk_size=chunk_size):
+                handler = RecordingHandler()
+                parser = Parser(handler)
+                for i in range(0, len(data), chunk_size):
+                    parser.feed(data[i:i + chunk_size])
+                parser.close()
+                decoded = 'x' * 5000 + '\né' + 'y' * 5000
+                self.assertEqual(handler.calls, [
+                    ("on_object_start",),
+                    ("on_key", decoded),
+                    ("on_array_start",),
+                    ("on_value", decoded),
+                    ("on_value", -12.3455),
+                    ("on_array_end",),
+                    ("on_object_end",),
+                ])
+                self.assertEqual(parser.token_parts, [])
+
+    def testBytesChunks(self):
+        data = '{"ключ": ["значение €", "\\u00e9\U0001f600", 1.5, true, -Infinity]}'.encode('utf-8')
+        expected_calls = [
+            ("on_object_start",),
+            ("on_key", "ключ"),
+            ("on_array_start",),
+            ("on_value", "значение €"),
+            ("on_value", "é\U0001f600"),
+            ("on_value", 1.5),
+            ("on_value", True),
+            ("on_value", float('-inf')),
+            ("on_array_end",),
+            ("on_object_end",),
+        ]
+
+        for bytes_mode in [False, True]:
+            for chunk_size in [1, 2, 3, 5, len(data)]:
+                for chunk_type in [bytes, memoryview]:
+                    with self.subTest(bytes_mode=bytes_mode, chunk_size=chunk_size, chunk_type=chunk_type):
+                        handler = RecordingHandler()
+                        parser = Parser(handler, bytes_mode=bytes_mode)
+                        for i in range(0, len(data), chunk_size):
+                            parser.feed(chunk_type(data[i:i + chunk_size]))
+                        parser.close()
+                        self.assertEqual(handler.calls, expected_calls)
+
+    def testBytesErrors(self):
+        for bytes_mode in [False, True]:
+            with self.subTest(bytes_mode=bytes_mode):
+                parser = Parser(bytes_mode=bytes_mode)
+                with self.assertRaises(ParseError):
+                    parser.feed(b'\xef\xbb\xbf[]')
+
+                parser = Parser(bytes_mode=bytes_mode)
+                with self.assertRaises(UnicodeDecodeError):
+                    parser.feed(b'["\xff"]')
+                    parser.close()
+
+        parser = Parser()
+        parser.feed(b'"\xe2\x82')
+        with self.assertRaises(UnicodeDecodeError):
+            parser.close()
+
+    def testParseFile(self):
+        data = '{"ключ": ["значение", 12345, true]}'
+        expected_events = [
+            ("object_start", None),
+            ("object_key_end", "ключ"),
+            ("array_start", None),
+            ("value_end", "значение"),
+            ("value_end", 12345),
+            ("value_end", True),
+            ("array_end", None),
+            ("object_end", None),
+        ]
+
+        fd, path = tempfile.mkstemp()
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as fp:
+                fp.write(data)
+
+            for bytes_mode in [False, True]:
+                for chunk_size in [1, 3, 65536]:
+                    with self.subTest(bytes_mode=bytes_mode, chunk_size=chunk_size):
+                        parser = Parser(bytes_mode=bytes_mode)
+                        self.assertEqual(list(parser.parse_file(path, chunk_size)), expected_events)
+
+            open(path, 'w').close()
+            with self.assertRaises(ParseError):
+                list(Parser().parse_file(path))
+        finally:
+            os.remove(path)
+
+    def testNoMaterialize(self):
+        data = '["a\\n", 12, -1.5e3, {"k": true}, null]'
+        for chunk_size in [1, len(data)]:
+            with self.subTest(chunk_size=chunk_size):
+                handler = RecordingHandler()
+                parser = Parser(handler)
+                parser.materialize = False
+                for i in range(0, len(data), chunk_size):
+                    parser.feed(data[i:i + chunk_size])
+                parser.close()
+                self.assertEqual(handler.calls, [
+                    ("on_array_start",),
+                    ("on_value", None),
+                    ("on_value", None),
+                    ("on_value", None),
+                    ("on_object_start",),
+                    ("on_key", None),
+                    ("on_value", True),
+                    ("on_object_end",),
+                    ("on_value", None),
+                    ("on_array_end",),
+                ])
+
+    def testSkip(self):
+        class SkippingHandler(RecordingHandler):
+
+            def __init__(self, parser):
+                super().__init__()
+                self.parser = parser
+
+            def on_array_start(self):
+                super().on_array_start()
+                self.parser.skip()
+
+            def on_key(self, key):
+                super().on_key(key)
+                if key.startswith("skip"):
+                    self.parser.skip()
+
+        data = '{"skip1": {"a": ["]", "\\"}"]}, "b": [1, {"c": "["}], "skip2": -1.5e3, "d": {"skip3": "x,"}, "e": 1}'
+        expected_calls = [
+            ("on_object_start",),
+            ("on_key", "skip1"),
+            ("on_key", "b"),
+            ("on_array_start",),
+            ("on_array_end",),
+            ("on_key", "skip2"),
+            ("on_key", "d"),
+            ("on_object_start",),
+            ("on_key", "skip3"),
+            ("on_object_end",),
+            ("on_key", "e"),
+            ("on_value", 1),
+            ("on_object_end",),
+        ]
+
+        for bytes_mode in [False, True]:
+            for chunk_size in [1, 2, 3, len(data)]:
+                with self.subTest(bytes_mode=bytes_mode, chunk_size=chunk_size):
+                    parser = Parser(bytes_mode=bytes_mode)
+                    handler = SkippingHandler(parser)
+                    parser.handler = handler
+                    for i in range(0, len(data), chunk_size):
+                        parser.feed(data[i:i + chunk_size])
+                    parser.close()
+                    self.assertEqual(handler.calls, expected_calls)
+
+        parser = Parser()
+        parser.feed('[1')
+        with self.assertRaises(RuntimeError):
+            parser.skip()
+
+    def testCheckpoint(self):
+        fixtures = [
+            '{"ключ": ["значение €", "\\u00e9\U0001f600", 1.5e3, true, -Infinity, 12345]}'.encode('utf-8'),
+            b'{"a": 1}\n[2, "x"]\n\x1e"y"\n',
+        ]
+        cur_dir = os.path.dirname(os.path.realpath(__file__))
+        for fixture_filename in sorted(glob.glob(cur_dir + "/json-checker/pass*")):
+            with open(fixture_filename, 'rb') as fixture_file:
+                fixtures.append(fixture_file.read())
+
+        for data in fixtures:
+            multi_document = data.startswith(b'{"a"')
+            for bytes_mode in [False, True]:
+                handler = RecordingHandler()
+                parser = Parser(handler, bytes_mode=bytes_mode, multi_document=multi_document)
+                parser.feed(data)
+                parser.close()
+                expected_calls = handler.calls
+
+                with self.subTest(data=data[:20], bytes_mode=bytes_mode):
+                    for split in range(len(data) + 1):
+                        handler = RecordingHandler()
+                        parser = Parser(handler, bytes_mode=bytes_mode, multi_document=multi_document)
+                        parser.feed(data[:split])
+                        blob = parser.checkpoint()
+
+                        parser = Parser(handler, bytes_mode=bytes_mode)
+                        offset = parser.restore(blob)
+                        self.assertEqual(offset, split)
+                        parser.feed(memoryview(data)[offset:])
+                        parser.close()
+                        self.assertEqual(handler.calls, expected_calls)
+
+        with self.assertRaises(ValueError):
+            Parser(bytes_mode=True).restore(Parser().checkpoint())
+
+    def testKeyCache(self):
+        data = '[{"key": 1, "k\\u00e9y": 2, "x": 3}, {"key": 4, "k\\u00e9y": 5, "x": 6}]'
+        for bytes_mode in [False, True]:
+            for key_cache_size in [0, 1, 1024]:
+                with self.subTest(bytes_mode=bytes_mode, key_cache_size=key_cache_size):
+                    handler = RecordingHandler()
+                    parser = Parser(handler, bytes_mode=bytes_mode, key_cache_size=key_cache_size)
+                    for i in range(0, len(data), 5):
+                        parser.feed(data[i:i + 5])
+                    parser.close()
+                    keys = [call[1] for call in handler.calls if call[0] == "on_key"]
+                    self.assertEqual(keys, ["key", "kéy", "x"] * 2)
+                    self.assertLessEqual(len(parser.key_cache), key_cache_size)
+                    if key_cache_size == 1024:
+                        self.assertIs(keys[1], keys[4])
+                        self.assertEqual(list(parser.key_cache.values()), ["key", "kéy", "x"])
+
+    def testValueCache(self):
+        data = '["ok", "\\u00e9", "ok", "", "a long string value", "\\u00e9", "ok", ""]'
+        expected_values = ["ok", "é", "ok", "", "a long string value", "é", "ok", ""]
+        for bytes_mode in [False, True]:
+            for value_cache_size in [0, 2, 1024]:
+                with self.subTest(bytes_mode=bytes_mode, value_cache_size=value_cache_size):
+                    handler = RecordingHandler()
+                    parser = Parser(handler, bytes_mode=bytes_mode, value_cache_size=value_cache_size,
+                                    value_cache_max_length=8)
+                    for i in range(0, len(data), 3):
+                        parser.feed(data[i:i + 3])
+                    parser.close()
+                    values = [call[1] for call in handler.calls if call[0] == "on_value"]
+                    self.assertEqual(values, expected_values)
+                    self.assertLessEqual(len(parser.value_cache), value_cache_size)
+                    if value_cache_size == 1024:
+                        self.assertEqual((parser.value_cache_hits, parser.value_cache_misses), (4, 3))
+                        self.assertIs(values[1], values[5])
+                    elif value_cache_size == 0:
+                        self.assertEqual((parser.value_cache_hits, parser.value_cache_misses), (0, 0))
+
+    def testNumberHooks(self):
+        data = '[0, -7, 123456789012, 1.10, -2.5e-3, NaN, Infinity, -Infinity]'
+        for bytes_mode in [False, True]:
+            for chunk_size in [1, 4, len(data)]:
+                with self.subTest(bytes_mode=bytes_mode, chunk_size=chunk_size):
+                    handler = RecordingHandler()
+                    parser = Parser(handler, bytes_mode=bytes_mode, parse_int=lambda s: "int " + s,
+                                    parse_float=Decimal, parse_constant=lambda s: "constant " + s)
+                    for i in range(0, len(data), chunk_size):
+                        parser.feed(data[i:i + chunk_size])
+                    parser.close()
+                    values = [call[1] for call in handler.calls if call[0] == "on_value"]
+                    self.assertEqual(values, [
+                        "int 0", "int -7", "int 123456789012", Decimal("1.10"), Decimal("-2.5e-3"),
+                        "constant NaN", "constant Infinity", "constant -Infinity"
+                    ])
+                    self.assertEqual(str(values[3]), "1.10")
+
+                    handler = RecordingHandler()
+                    parser = Parser(handler, bytes_mode=bytes_mode)
+                    parser.feed(data[:-1] + ', -0, 999, -1000]')
+                    parser.close()
+                    values = [call[1] for call in handler.calls if call[0] == "on_value"]
+                    self.assertEqual(values[:5] + values[-3:], [0, -7, 123456789012, 1.1, -2.5e-3, 0, 999, -1000])
+                    self.assertEqual([type(value) for value in values[-3:]], [int] * 3)
+
+    def testConstantHook(self):
+        def reject(literal):
+            raise ValueError("constant {} not allowed".format(literal))
+
+        for bytes_mode in [False, True]:
+            for chunk_size in [1, 4, 100]:
+                with self.subTest(bytes_mode=bytes_mode, chunk_size=chunk_size):
+                    data = '[1, 2.5, "NaN", true]'
+                    handler = RecordingHandler()
+                    parser = Parser(handler, bytes_mode=bytes_mode, parse_constant=reject)
+                    for i in range(0, len(data), chunk_size):
+                        parser.feed(data[i:i + chunk_size])
+                    parser.close()
+                    values = [call[1] for call in handler.calls if call[0] == "on_value"]
+                    self.assertEqual(values, [1, 2.5, "NaN", True])
+
+                    parser = Parser(bytes_mode=bytes_mode, parse_constant=reject)
+                    with self.assertRaisesRegex(ValueError, "constant Infinity not allowed"):
+                        data = '[1, Infinity]'
+                        for i in range(0, len(data), chunk_size):
+                            parser.feed(data[i:i + chunk_size])
+
+                    # The hook is called for every occurrence, as json.loads() does
+                    data = '[NaN, -Infinity, NaN]'
+                    literals = []
+                    handler = RecordingHandler()
+                    parser = Parser(handler, bytes_mode=bytes_mode,
+                                    parse_constant=lambda literal: literals.append(literal) or [literal])
+                    for i in range(0, len(data), chunk_size):
+                        parser.feed(data[i:i + chunk_size])
+                    parser.close()
+                    values = [call[1] for call in handler.calls if call[0] == "on_value"]
+                    self.assertEqual(literals, ["NaN", "-Infinity", "NaN"])
+                    self.assertEqual(values, [["NaN"], ["-Infinity"], ["NaN"]])
+                    self.assertIsNot(values[0], values[2])
+
+    def testFeedErrors(self):
+        for chunks in [['[1,', ']'], ['{"a"', '}'], ['[1]', '2']]:
+            with self.subTest(chunks=chunks):
+                parser = Parser()
+                with self.assertRaises(ParseError):
+                    for chunk in chunks:
+                        parser.feed(chunk)
+                    parser.close()
+
+        parser = Parser()
+        parser.feed('[1')
+        with self.assertRaises(ParseError):
+            parser.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
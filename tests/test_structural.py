@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+from parser import Parser
+from structural import StructuralParser, find_structurals
+from exceptions import ParseError
+import structural
+import glob
+import os
+import unittest
+
+
+class TestStructuralParser(unittest.TestCase):
+
+    cur_dir = os.path.dirname(os.path.realpath(__file__))
+    stage1_modes = [False] if structural.numpy is None else [False, True]
+
+    @staticmethod
+    def _parse(parser, data, chunk_size):
+        events = []
+        try:
+            for event in parser.parse(data[i:i + chunk_size] for i in range(0, len(data), chunk_size)):
+                events.append(event)
+        except (ParseError, UnicodeDecodeError):
+            return events, True
+
+        # NaN is not equal to itself
+        return [(name, 'NaN' if value != value else value) for name, value in events], False
+
+    def testFindStructurals(self):
+        data = b'{"a\\\\": "[\\"]", "b\\\\\\"": [1]}'
+        expected = [0, 1, 5, 6, 8, 13, 14, 16, 22, 23, 25, 27, 28]
+        for use_numpy in self.stage1_modes:
+            for chunk_size in [1, 2, 3, len(data)]:
+                with self.subTest(use_numpy=use_numpy, chunk_size=chunk_size):
+                    positions = []
+                    in_string = escaped = False
+                    for i in range(0, len(data), chunk_size):
+                        chunk_positions, in_string, escaped = find_structurals(data[i:i + chunk_size], in_string,
+                                                                               escaped, use_numpy)
+                        positions.extend(i + position for position in chunk_positions)
+                    self.assertEqual(positions, expected)
+                    self.assertEqual((in_string, escaped), (False, False))
+
+    def testEvents(self):
+        fixtures = [
+            '{"ключ": ["значение €", "\\u00e9\\"\\\\", 1.5e3, true, -Infinity, NaN, 0, -12, []], "a": {}}',
+            ' [ 1 , 2 ] ',
+            '"x"',
+            '-0.5',
+        ]
+        fixture_filenames = glob.glob(self.cur_dir + "/json-checker/*.json") + \
+            glob.glob(self.cur_dir + "/json-test-suite/*.json")
+        for fixture_filename in sorted(fixture_filenames):
+            with open(fixture_filename, 'rb') as fixture_file:
+                fixtures.append(fixture_file.read())
+
+        for data in fixtures:
+            if isinstance(data, str):
+                data = data.encode('utf-8')
+            expected = self._parse(Parser(bytes_mode=True), data, len(data) or 1)
+
+            for use_numpy in self.stage1_modes:
+                # Every chunk is classified with a few NumPy calls, which are too slow to run on single bytes
+                if len(data) > 10000:
+                    chunk_sizes = [4096]
+                else:
+                    chunk_sizes = [5, len(data) or 1] if use_numpy else [1, 5, len(data) or 1]
+                for chunk_size in chunk_sizes:
+                    with self.subTest(data=data[:30], use_numpy=use_numpy, chunk_size=chunk_size):
+                        events, failed = self._parse(StructuralParser(use_numpy=use_numpy), data, chunk_size)
+                        self.assertEqual(failed, expected[1])
+                        if not failed:
+                            self.assertEqual(events, expected[0])
+
+    def testErrors(self):
+        for data in ['', '[1,]', '{"a" 1}', '[1 2]', '["a]', '{"a": 1} x', '1 2', '{1: 2}', '[]]', '{"a": 1,}',
+                     '["\x01"]', '["\\x"]', '[tru]', '[01]', '[1]:', '"a":', '{"a"}', ',']:
+            with self.subTest(data=data):
+                with self.assertRaises(ParseError):
+                    list(StructuralParser().parse([data]))
+
+
+if __name__ == '__main__':
+    unittest.main()